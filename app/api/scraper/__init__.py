@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
-from app.api.scraper.controller import scraper_controller
+from app.api.scraper.controller import batch_controller, job_controller, scraper_controller
 
 api_router = APIRouter()
-api_router.include_router(scraper_controller.router, prefix="/company")
\ No newline at end of file
+api_router.include_router(scraper_controller.router, prefix="/company")
+api_router.include_router(job_controller.router, prefix="/jobs")
+api_router.include_router(batch_controller.router, prefix="/batches")
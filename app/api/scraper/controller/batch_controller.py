@@ -0,0 +1,42 @@
+import logging
+from fastapi import APIRouter, HTTPException
+from app.api.scraper.controller.scraper_controller import get_tasks
+from app.model.request.batch_request import BatchRequest
+from app.model.response.batch_response import BatchResponse, BatchStatusResponse
+from app.model.response.job_response import JobResponse
+from app.service.job_service import job_manager
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.post("", status_code=202, response_model=BatchResponse, summary="Queue jobs to process many companies")
+def process_batch(request: BatchRequest):
+    logger.info("Starting batch for %d companies", len(request.companies))
+    try:
+        batch = job_manager.submit_batch([
+            (
+                company.company_name.strip().lower(),
+                get_tasks(company.website, company.sedar),
+                company.max_age,
+                company.force_refresh
+            )
+            for company in request.companies
+        ])
+        return BatchResponse(
+            batch_id=batch.id,
+            status=batch.status,
+            jobs=[JobResponse(job_id=job.id, status=job.status) for job in batch.jobs]
+        )
+    except Exception as e:
+        logger.exception("Unexpected error while queueing batch processing.")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{batch_id}", response_model=BatchStatusResponse, summary="Get the progress of a batch and its jobs")
+def get_batch_status(batch_id: str):
+    batch = job_manager.get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found.")
+    return batch.to_dict()
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from typing import Literal
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from app.core.config import settings
+from app.model.response.job_response import JobStatusResponse
+from app.service.job_service import job_manager, COMPLETED, FAILED, PARTIAL
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job
+
+
+# Yield a job's events as they are published, or None after keepalive seconds without one, until the job has finished
+# or the client has gone away
+async def iter_job_events(request: Request, job, keepalive=None):
+    events = job.subscribe()
+    idle = 0.0
+    poll = settings.STREAM_DISCONNECT_POLL_SECONDS
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(events.get(), timeout=poll)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                idle += poll
+                if keepalive and idle >= keepalive:
+                    idle = 0.0
+                    yield None
+                continue
+            idle = 0.0
+            yield event
+            if event["type"] == "job" or await request.is_disconnected():
+                return
+    finally:
+        job.unsubscribe(events)
+
+
+# Stream a job's events as NDJSON lines or server-sent events, starting from its first event
+def stream_job(request: Request, job, format: str = "ndjson"):
+    async def ndjson():
+        async for event in iter_job_events(request, job):
+            yield orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE)
+
+    async def sse():
+        async for event in iter_job_events(request, job, keepalive=settings.STREAM_KEEPALIVE_SECONDS):
+            if event is None:
+                yield b": keepalive\n\n"
+            else:
+                yield b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+    if format == "sse":
+        return StreamingResponse(sse(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse, summary="Get the status and progress of a job")
+def get_job_status(job_id: str):
+    return get_job_or_404(job_id).to_dict()
+
+
+@router.get("/{job_id}/result", summary="Get the combined results of a finished job")
+def get_job_result(job_id: str):
+    job = get_job_or_404(job_id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=f"Job failed: {job.error}")
+    if job.status not in (COMPLETED, PARTIAL):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}.")
+
+    logger.info("Returning combined results for job %s (%s)", job.id, job.company_name)
+    return ORJSONResponse(content=job.result)
+
+
+@router.get("/{job_id}/stream", summary="Stream a job's progress and each part of its results as soon as it is ready")
+async def stream_job_events(request: Request, job_id: str, format: Literal["ndjson", "sse"] = Query("ndjson")):
+    return stream_job(request, get_job_or_404(job_id), format)
@@ -1,67 +1,47 @@
 import logging
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.api.scraper.controller.job_controller import stream_job
 from app.model.request.process_request import ProcessRequest
-import subprocess
-import os
-import json
+from app.model.response.job_response import JobResponse
+from app.service.job_service import job_manager
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 router = APIRouter()
-SERVICE_SCRIPT = "app.service.scraper_service"
 
 
-def run_service(company_name: str, website: bool, sedar: bool) -> str:
-    logger.info("Preparing to run service for company: %s", company_name)
-    company_name = company_name.strip().lower()
+def get_tasks(website: bool, sedar: bool) -> list[str]:
     tasks = []
     if website:
         tasks.append("website")
     if sedar:
         tasks.append("sedar")
+    return tasks
 
-    command = ["python", "-m", SERVICE_SCRIPT, company_name]
-    if tasks:
-        command.extend(["--tasks", *tasks])
 
-    logger.info("Executing command: %s", command)
-    try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        logger.info("Service execution completed successfully.")
-    except subprocess.CalledProcessError as e:
-        logger.exception("Error running service.")
-        raise HTTPException(status_code=500, detail=f"Service error: {e.stderr.strip()}")
-
-    if not result.stdout:
-        logger.error("Service returned no output.")
-        raise HTTPException(status_code=500, detail="Service returned no output.")
-
-    return result.stdout
-
-
-@router.post("", summary="Process Company and return combined results")
+@router.post("", status_code=202, response_model=JobResponse, summary="Queue a job to process a company")
 def process_company(request: ProcessRequest):
     logger.info("Starting process for company: %s", request.company_name)
     try:
-        run_service(request.company_name, request.website, request.sedar)
-        combined_file_path = "json_files/combined_results.json"
-
-        if not os.path.exists(combined_file_path):
-            logger.error("Combined results file not found after service execution.")
-            raise HTTPException(
-                status_code=500, detail="Combined results file not found."
-            )
-
-        with open(combined_file_path, "r", errors="ignore") as f:
-            combined_data = json.load(f)
-
-        logger.info("Successfully returning combined results for company: %s", request.company_name)
-        return JSONResponse(content=combined_data)
-    except HTTPException as e:
-        logger.exception("HTTPException during company processing.")
-        raise e
+        company_name = request.company_name.strip().lower()
+        job = job_manager.submit(
+            company_name, get_tasks(request.website, request.sedar), request.max_age, request.force_refresh
+        )
+        return JobResponse(job_id=job.id, status=job.status)
     except Exception as e:
-        logger.exception("Unexpected error during company processing.")
+        logger.exception("Unexpected error while queueing company processing.")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/stream", summary="Process a company and stream each part of its results as soon as it is ready")
+async def process_company_stream(
+    http_request: Request, request: ProcessRequest, format: Literal["ndjson", "sse"] = Query("ndjson")
+):
+    logger.info("Starting streamed process for company: %s", request.company_name)
+    company_name = request.company_name.strip().lower()
+    job = job_manager.submit(
+        company_name, get_tasks(request.website, request.sedar), request.max_age, request.force_refresh
+    )
+    return stream_job(http_request, job, format)
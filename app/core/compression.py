@@ -0,0 +1,39 @@
+import logging
+
+from starlette.middleware.gzip import GZipMiddleware
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # Optional: brotli responses need brotli-asgi
+    BrotliMiddleware = None
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses according to RESPONSE_COMPRESSION, except streamed results (paths ending in /stream),
+    which a compressor would hold back until enough bytes had accumulated.
+    """
+
+    def __init__(self, app, compression=None, minimum_size=None):
+        self.app = app
+        compression = compression or settings.RESPONSE_COMPRESSION
+        minimum_size = minimum_size or settings.RESPONSE_COMPRESSION_MIN_SIZE
+        if compression in ("auto", "brotli") and BrotliMiddleware is not None:
+            # Clients that do not accept brotli still get gzip
+            self.compressed = BrotliMiddleware(app, minimum_size=minimum_size, gzip_fallback=True)
+        elif compression in ("auto", "brotli", "gzip"):
+            if compression == "brotli":
+                logger.warning("brotli-asgi is not installed; compressing responses with gzip instead.")
+            self.compressed = GZipMiddleware(app, minimum_size=minimum_size)
+        else:
+            self.compressed = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].endswith("/stream"):
+            await self.compressed(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
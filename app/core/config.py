@@ -5,4 +5,95 @@ class Settings(BaseSettings):
     VERSION: str = "1.0.0"
     API_PREFIX: str = "/api/scraper"
 
-settings = Settings()
\ No newline at end of file
+    # In-process task orchestration
+    ORCHESTRATOR_MAX_WORKERS: int = 8
+    # Background jobs, each running in its own workspace directory under WORKSPACE_ROOT
+    JOB_MAX_CONCURRENCY: int = 4
+    JOB_RETENTION_SECONDS: int = 3600
+    JOB_PURGE_INTERVAL_SECONDS: int = 60
+    STREAM_KEEPALIVE_SECONDS: float = 15.0
+    STREAM_DISCONNECT_POLL_SECONDS: float = 1.0
+    # Results are built in memory; set PERSIST_RESULTS to also write each finished job's results to RESULTS_DIRECTORY
+    PERSIST_RESULTS: bool = False
+    RESULTS_DIRECTORY: str = "results"
+    # Response compression: auto (brotli if brotli-asgi is installed, else gzip), brotli, gzip or none
+    RESPONSE_COMPRESSION: str = "auto"
+    RESPONSE_COMPRESSION_MIN_SIZE: int = 1024
+    BATCH_MAX_COMPANIES: int = 5000
+    # Batch jobs whose tasks are queued at once across all batches, so single requests are not held up by a whole batch
+    BATCH_MAX_CONCURRENCY: int = 4
+    # Shared HTTP client used for crawling and PDF downloads
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_CONCURRENCY: int = 50
+    HTTP_PER_HOST_CONCURRENCY: int = 8
+    HTTP_TIMEOUT: float = 10.0
+    HTTP2_ENABLED: bool = True
+    HTTP_CHUNK_SIZE: int = 64 * 1024
+
+    # Cache of URL -> is-a-PDF verdicts shared by all crawls
+    PDF_PROBE_TTL_SECONDS: int = 3600
+    PDF_PROBE_CACHE_SIZE: int = 50000
+
+    # Largest PDF that will be downloaded
+    PDF_MAX_BYTES: int = 250 * 1024 * 1024
+
+    # Per-crawl pipeline downloading and extracting linked PDFs alongside the HTML crawl
+    PDF_DOWNLOAD_WORKERS: int = 4
+    PDF_PROCESSING_WORKERS: int = 2
+
+    # Process pool for PDF text extraction; 0 workers means one per CPU core
+    PDF_EXTRACTION_WORKERS: int = 0
+    PDF_PAGES_PER_CHUNK: int = 50
+    PDF_MIN_PARALLEL_PAGES: int = 8
+    PDF_EXTRACTION_MAX_CONCURRENCY: int = 4  # documents extracted at once across all jobs
+
+    # Page streaming budgets for PDF extraction and analysis; 0 means unlimited
+    PDF_MAX_PAGES: int = 0
+    PDF_TIME_BUDGET_SECONDS: float = 0
+    PDF_STOP_WHEN_ALL_KEYWORDS_FOUND: bool = False  # opt-in: stop at the first hit of every keyword
+    PDF_ANALYSIS_WITH_PAGES: bool = False
+
+    # Content-addressed PDF store shared by all jobs, with cached text and keyword analyses
+    PDF_STORE_DIRECTORY: str = "pdf_store"
+    # Least recently used documents are evicted past the size limit or once unused for the max age; 0 means unlimited
+    PDF_STORE_MAX_BYTES: int = 5 * 1024 * 1024 * 1024
+    PDF_STORE_MAX_AGE_SECONDS: int = 30 * 24 * 3600
+    PDF_STORE_PRUNE_INTERVAL_SECONDS: int = 300
+
+    # Website crawls running at once across all jobs, and concurrent workers per crawl
+    WEBSITE_MAX_CONCURRENCY: int = 4
+    CRAWL_WORKERS: int = 8
+    PAGE_CACHE_MAX_ENTRIES: int = 512
+    PAGE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # bs4, or opt in to selectolax, lxml or auto (fastest installed), which may differ on malformed pages
+    HTML_PARSER: str = "bs4"
+
+    WORKSPACE_ROOT: str = "workspaces"
+    COMPANY_CSV_PATH: str = "app/scraper/filtered_companies_canada.csv"
+    # Cache of task results per company: memory, sqlite, mongo or none. TTLs are in seconds per task
+    RESULTS_CACHE_BACKEND: str = "memory"
+    RESULTS_CACHE_TTL_SECONDS: dict[str, int] = {"website": 24 * 3600, "sedar": 7 * 24 * 3600}
+    RESULTS_CACHE_DEFAULT_TTL_SECONDS: int = 24 * 3600
+    RESULTS_CACHE_SQLITE_PATH: str = "results_cache.sqlite3"
+    RESULTS_CACHE_COLLECTION: str = "results_cache"
+    MONGO_URL: str = "mongodb://localhost:27017"
+    MONGO_DATABASE: str = "sustain_scraper"
+    # How long a MongoDB operation waits for a reachable server before failing
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 2000
+
+    # Smallest trigram similarity for a near-miss company name to match; 0 disables fuzzy matching
+    COMPANY_MATCH_MIN_SIMILARITY: float = 0.8
+
+    # SEDAR+ automation: explicit waits and download completion detection
+    SEDAR_WAIT_TIMEOUT: float = 20.0
+    SEDAR_DOWNLOAD_TIMEOUT: float = 120.0
+    DOWNLOAD_POLL_INTERVAL: float = 0.25
+    DOWNLOAD_STABLE_SECONDS: float = 0.5
+
+    # Pool of warm headless Chrome sessions leased to SEDAR jobs
+    WEBDRIVER_POOL_SIZE: int = 2
+    WEBDRIVER_MAX_USES: int = 50
+    WEBDRIVER_DOWNLOAD_ROOT: str = "browser_downloads"
+    WEBDRIVER_WARM_ON_STARTUP: bool = True
+
+settings = Settings()
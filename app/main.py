@@ -1,13 +1,47 @@
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
 from app.api.scraper import api_router
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.scraper.automation.webdriver_pool import webdriver_pool
+from app.scraper.http_client import close_fetcher
+from app.scraper.pdf_extraction import pdf_extractor
+from app.service.job_service import job_manager
+from app.service.results_cache import results_cache
+from app.service.scraper_service import orchestrator, result_writer
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Launch the browser sessions in the background so startup is not held up by Chrome
+    if settings.WEBDRIVER_WARM_ON_STARTUP:
+        threading.Thread(target=webdriver_pool.warm, name="webdriver-warmup", daemon=True).start()
+    if results_cache:
+        results_cache.open()
+    yield
+    job_manager.shutdown()
+    orchestrator.shutdown(wait=False)
+    close_fetcher()
+    pdf_extractor.shutdown()
+    webdriver_pool.shutdown()
+    if results_cache:
+        results_cache.close()
+    result_writer.shutdown(wait=True)
 
 def create_app() -> FastAPI:
-    app = FastAPI(title=settings.APP_NAME, version=settings.VERSION)
+    app = FastAPI(
+        title=settings.APP_NAME,
+        version=settings.VERSION,
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse
+    )
+    app.add_middleware(CompressionMiddleware)
 
     app.include_router(api_router, prefix=settings.API_PREFIX)
 
     return app
 
-app = create_app()
\ No newline at end of file
+app = create_app()
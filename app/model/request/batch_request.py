@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.model.request.process_request import ProcessRequest
+
+# Define the request body model for processing many companies at once
+class BatchRequest(BaseModel):
+    companies: list[ProcessRequest] = Field(min_length=1, max_length=settings.BATCH_MAX_COMPANIES)
@@ -1,7 +1,12 @@
-from pydantic import BaseModel
+from typing import Optional
+
+from pydantic import BaseModel, Field
 
 # Define the request body model
 class ProcessRequest(BaseModel):
     company_name: str
     website: bool
-    sedar: bool
\ No newline at end of file
+    sedar: bool
+    # Only use cached results at most this many seconds old, or ignore the cache entirely with force_refresh
+    max_age: Optional[int] = Field(default=None, ge=0)
+    force_refresh: bool = False
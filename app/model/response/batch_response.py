@@ -0,0 +1,20 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.model.response.job_response import JobResponse, JobStatusResponse
+
+# Returned when a batch is accepted, with the job queued for each company in request order
+class BatchResponse(BaseModel):
+    batch_id: str
+    status: str
+    jobs: list[JobResponse]
+
+# Status of a batch, with job counts by status and the progress of each company's job
+class BatchStatusResponse(BaseModel):
+    batch_id: str
+    status: str
+    created_at: float
+    finished_at: Optional[float] = None
+    counts: dict[str, int]
+    jobs: list[JobStatusResponse]
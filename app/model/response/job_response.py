@@ -0,0 +1,17 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+# Returned when a job is accepted
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+
+# Status and per-task progress of a job
+class JobStatusResponse(JobResponse):
+    company_name: str
+    tasks: dict[str, str]
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
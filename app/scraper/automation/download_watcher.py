@@ -0,0 +1,78 @@
+import os
+import time
+
+from app.core.config import settings
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # Not on Linux, or not installed: fall back to polling
+    INotify = None
+
+# Suffixes browsers give to files that are still being downloaded
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".tmp")
+
+
+class _DirectoryEvents:
+    """
+    Waits for files to be created, renamed into or finished writing in a directory, using inotify when it
+    is available and a plain sleep otherwise.
+    """
+
+    def __init__(self, directory, poll_interval):
+        self.poll_interval = poll_interval
+        self.inotify = None
+        if INotify is not None:
+            try:
+                self.inotify = INotify()
+                self.inotify.add_watch(directory, flags.CREATE | flags.MOVED_TO | flags.CLOSE_WRITE | flags.MODIFY)
+            except OSError:
+                self.close()
+
+    def wait(self, timeout):
+        if self.inotify is not None:
+            self.inotify.read(timeout=int(timeout * 1000))
+        else:
+            time.sleep(min(timeout, self.poll_interval))
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+
+
+def _new_completed_files(directory, existing_files):
+    return [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name not in existing_files and not name.endswith(PARTIAL_SUFFIXES)
+    ]
+
+# Block until a new, completely downloaded file appears in the directory and return its path.
+# existing_files is the set of names present before the download started.
+def wait_for_download(directory, existing_files, timeout=None, stable_seconds=None, poll_interval=None):
+    timeout = timeout or settings.SEDAR_DOWNLOAD_TIMEOUT
+    stable_seconds = settings.DOWNLOAD_STABLE_SECONDS if stable_seconds is None else stable_seconds
+    poll_interval = poll_interval or settings.DOWNLOAD_POLL_INTERVAL
+    deadline = time.monotonic() + timeout
+
+    events = _DirectoryEvents(directory, poll_interval)
+    try:
+        last_seen = None
+        while True:
+            candidates = _new_completed_files(directory, existing_files)
+            if candidates:
+                path = max(candidates, key=os.path.getmtime)
+                size = os.path.getsize(path)
+                # The file is complete once its size is non-zero and has not changed for stable_seconds
+                if last_seen and last_seen[0] == path and last_seen[1] == size and size > 0 \
+                        and time.monotonic() - last_seen[2] >= stable_seconds:
+                    return path
+                if not last_seen or last_seen[:2] != (path, size):
+                    last_seen = (path, size, time.monotonic())
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No completed download appeared in {directory} within {timeout} seconds.")
+            wait_time = min(remaining, poll_interval) if candidates else remaining
+            events.wait(wait_time)
+    finally:
+        events.close()
@@ -0,0 +1,185 @@
+import os
+import queue
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium_stealth import stealth
+
+from app.core.config import settings
+
+# Launch a headless, stealth-patched Chrome that downloads files into the given directory
+def create_webdriver(download_directory):
+    chrome_options = Options()
+    prefs = {
+        "download.default_directory": os.path.abspath(download_directory),
+        "download.prompt_for_download": False,
+        "download.directory_upgrade": True,
+        "safebrowsing.enabled": True,
+    }
+    chrome_options.add_experimental_option("prefs", prefs)
+    chrome_options.add_argument("--start-maximized")
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+
+    driver = webdriver.Chrome(options=chrome_options)
+
+    stealth(
+        driver,
+        languages=["en-US", "en"],
+        vendor="Google Inc.",
+        platform="Win32",
+        webgl_vendor="Intel Inc.",
+        renderer="Intel Iris OpenGL Engine",
+        fix_hairline=True,
+    )
+    return driver
+
+
+class BrowserSession:
+    """A pooled Chrome driver with its own download directory."""
+
+    def __init__(self, driver, download_directory):
+        self.driver = driver
+        self.download_directory = download_directory
+        self.uses = 0
+        self.broken = False
+        # SEDAR+ search page reached by this browser, reopened directly by the next lease
+        self.search_url = None
+
+
+class WebDriverPool:
+    """
+    Keeps up to `size` warm headless Chrome sessions and leases them to SEDAR jobs, so steady-state
+    requests skip the browser launch. Every session downloads into its own directory, so concurrent
+    leases never see each other's files.
+
+    Idle sessions are health-checked before being handed out. A session is closed instead of returned
+    to the pool once it has served max_uses leases, has been marked broken by its user, or would take the
+    number of live sessions (idle and leased) over `size`.
+    """
+
+    def __init__(self, size=None, max_uses=None, root=None):
+        self.size = size or settings.WEBDRIVER_POOL_SIZE
+        self.max_uses = max_uses or settings.WEBDRIVER_MAX_USES
+        self.root = root or settings.WEBDRIVER_DOWNLOAD_ROOT
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(self.size)
+        self.closed = False
+        # Sessions currently alive, idle or leased
+        self.live = 0
+        self.lock = threading.Lock()
+
+    # Start sessions until `size` are alive
+    def warm(self):
+        while True:
+            with self.lock:
+                if self.closed or self.live >= self.size:
+                    return
+            try:
+                session = self._create()
+            except WebDriverException as e:
+                print(f"Could not warm the browser pool: {e}")
+                return
+            self._release(session)
+
+    # Lease a session for the duration of the with-block; leases beyond `size` wait for a free session
+    @contextmanager
+    def lease(self):
+        self.slots.acquire()
+        session = None
+        try:
+            session = self._acquire()
+            yield session
+        except Exception:
+            if session is not None:
+                session.broken = True
+            raise
+        finally:
+            if session is not None:
+                session.uses += 1
+                self._release(session)
+            self.slots.release()
+
+    def shutdown(self):
+        self.closed = True
+        while True:
+            try:
+                self._retire(self.idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def _acquire(self):
+        while True:
+            try:
+                session = self.idle.get_nowait()
+            except queue.Empty:
+                return self._create()
+            if self._is_healthy(session):
+                return session
+            self._retire(session)
+
+    def _release(self, session):
+        with self.lock:
+            keep = not (
+                self.closed or session.broken or session.uses >= self.max_uses or self.live > self.size
+            )
+            if not keep:
+                self.live -= 1
+        if not keep:
+            self._destroy(session)
+            return
+        self._clear_downloads(session)
+        self.idle.put(session)
+
+    # A lease holding a slot may always create a session; any excess over `size` is closed when released
+    def _create(self):
+        with self.lock:
+            self.live += 1
+        download_directory = os.path.join(self.root, f"session-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(download_directory, exist_ok=True)
+            return BrowserSession(create_webdriver(download_directory), download_directory)
+        except Exception:
+            with self.lock:
+                self.live -= 1
+            shutil.rmtree(download_directory, ignore_errors=True)
+            raise
+
+    def _retire(self, session):
+        with self.lock:
+            self.live -= 1
+        self._destroy(session)
+
+    @staticmethod
+    def _is_healthy(session):
+        try:
+            return session.driver.execute_script("return 1") == 1
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _clear_downloads(session):
+        for name in os.listdir(session.download_directory):
+            path = os.path.join(session.download_directory, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+
+    @staticmethod
+    def _destroy(session):
+        try:
+            session.driver.quit()
+        except WebDriverException:
+            pass
+        shutil.rmtree(session.download_directory, ignore_errors=True)
+
+
+webdriver_pool = WebDriverPool()
@@ -1,14 +1,46 @@
+import itertools
 import os
+import queue
 import sys
-import requests
-
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from bs4 import BeautifulSoup
+import threading
+from collections import Counter
+
+import httpx
+
+from app.core.config import settings
+from app.scraper.html_parsers import get_html_parser
+from app.scraper.http_client import get_fetcher
+from app.scraper.page_cache import PageCache
+from app.scraper.parsed_page import Anchor, ParsedPage
+from app.scraper.pdf_pipeline import PDFPipeline
+from app.scraper.pdf_probe import pdf_probe
 from app.scraper.pdf_scraper import PDFScraper
 from app.service.website_identifier_service import get_company_website
 import app.util.website_keywords as wk
 
 
+class CrawlItem:
+    """
+    A page waiting in the crawl frontier, with the section it belongs to and the page that linked to it.
+    """
+
+    _sequence = itertools.count()
+
+    def __init__(self, url, link_text, section, depth=0, max_depth=1, parent=None):
+        self.url = url
+        self.link_text = link_text
+        self.section = section
+        self.depth = depth
+        self.max_depth = max_depth
+        self.parent = parent
+        self.page_data = None
+        self.pdf_futures = []
+        self.sequence = next(self._sequence)
+
+    def child(self, url, link_text):
+        return CrawlItem(url, link_text, self.section, self.depth + 1, self.max_depth, parent=self)
+
+
 class CompanyWebsiteScraper:
     """
     A web scraping tool for extracting structured data and PDF documents from a company's website.
@@ -16,17 +48,39 @@ class CompanyWebsiteScraper:
     It scans specific sections identified by keywords (e.g., 'about', 'sustainability', 'reports', 'products'),
     processes linked PDF files, handles navigation bar links, and excludes irrelevant pages based on
     exclusion keywords. The extracted data is stored in a JSON for further use.
+
+    If on_section(section, section_data) is given, it is called from a crawl thread as soon as each section's
+    pages and PDFs are all processed, before the rest of the crawl finishes.
     """
 
-    def __init__(self, base_url, extract_pdfs=True, pdf_directory='downloaded_pdfs'):
+    def __init__(
+        self,
+        base_url,
+        extract_pdfs=True,
+        pdf_directory='downloaded_pdfs',
+        temp_directory='temp_downloads',
+        json_directory='json_files',
+        crawl_workers=None,
+        on_section=None
+    ):
         self.base_url = base_url.rstrip('/')
         self.headers = {"User-Agent": "Mozilla/5.0"}
+        self.fetcher = get_fetcher()
+        self.page_cache = PageCache()
+        self.html_parser = get_html_parser()
         self.explored_urls = set()
         self.pdf_checked_urls = set()
         self.extract_pdfs = extract_pdfs
         self.pdf_directory = pdf_directory
-        self.pdf_processor = PDFScraper(pdf_directory=self.pdf_directory, headers=self.headers)
+        self.pdf_processor = PDFScraper(
+            pdf_directory=self.pdf_directory,
+            temp_directory=temp_directory,
+            json_directory=json_directory,
+            headers=self.headers
+        )
+        self.pdf_pipeline = None
         self.data = {}
+        self.on_section = on_section
 
         # Create directory for PDFs if it doesn't exist
         if self.extract_pdfs and not os.path.exists(self.pdf_directory):
@@ -34,209 +88,309 @@ class CompanyWebsiteScraper:
 
         # Keywords to identify sections of interest on the website and exclude certain pages
         self.keywords = wk.keywords
-        self.exclusion_keywords = wk.exclusion_keywords
+        self.matcher = wk.matcher
 
         # Optional: lower recursion depth to limit link exploration
         # (Reduces processing time at the cost of skipping deeper pages)
         self.default_max_depth = 1  # or keep it 2 if needed
 
+        # Number of concurrent workers draining the crawl frontier
+        self.crawl_workers = crawl_workers or settings.CRAWL_WORKERS
+        self.lock = threading.Lock()
+
+        # Frontier items and PDFs still being processed per section, and the items crawled so far
+        self.section_pending = Counter()
+        self.crawled_items = []
+
     def scrape(self):
         """
         Main entry point to scrape predefined sections (e.g., 'about', 'sustainability', 'reports', 'products').
-        Fetch relevant links, include navbar links for 'products', then recursively scrape.
+        Fetch relevant links, include navbar links for 'products', then crawl them all concurrently.
         """
-        for section, keywords in self.keywords.items():
+        seeds = []
+        for section in self.keywords:
             print(f"Scraping section: {section}")
             # Get all links relevant to the section
-            section_links = self.get_relevant_links(self.base_url, keywords)
+            section_links = self.get_relevant_links(self.base_url, section)
 
             # For the 'products' section, include navbar links as they often contain product information
             if section == 'products':
-                navbar_links = self.get_navbar_links(self.base_url, keywords)
+                navbar_links = self.get_navbar_links(self.base_url, section)
                 section_links.update(navbar_links)
 
             # Optional: reduce max_depth for faster processing
             max_depth = 1 if section in ['reports', 'products'] else self.default_max_depth
 
             for link_text, url in section_links.items():
-                content = self.explore_and_scrape(url, keywords, current_depth=0, max_depth=max_depth)
-                # Add the scraped content to the data structure
-                if content:
-                    self.data.setdefault(section, {})[link_text] = content
+                seeds.append(CrawlItem(url, link_text, section, depth=0, max_depth=max_depth))
+
+        self.crawl(seeds)
 
-    def get_relevant_links(self, url, keywords):
+    def get_relevant_links(self, url, section):
         """
-        Fetch links from a page matching specific keywords, excluding irrelevant or duplicate links.
+        Fetch links from a page matching a section's keywords, excluding irrelevant or duplicate links.
         Returns { link_text: full_url }.
         """
         relevant_links = {}
-        soup = self.get_soup(url)
-        if soup:
-            for link in soup.find_all("a", href=True):
-                text_lower = link.get_text(strip=True).lower() # Extract link text and normalize to lowercase
-                href = link["href"] # Extract the hyperlink reference
-                if any(keyword in text_lower for keyword in keywords): # Check if any keyword matches
-                    full_url = self.get_full_url(href) # Convert to absolute URL
-                    if not self.is_excluded_link(text_lower, full_url): # Exclude irrelevant links
-                        relevant_links[text_lower] = full_url
+        page = self.get_page(url)
+        if page:
+            for anchor in page.anchors:
+                if section in anchor.sections and not anchor.excluded:
+                    relevant_links[anchor.text_lower] = anchor.url
         return relevant_links
 
-    def get_navbar_links(self, url, keywords):
+    def get_navbar_links(self, url, section):
         """
         Specifically fetch links from the website's navigation bar.
         Useful for finding product-related pages.
         Returns { link_text: full_url }.
         """
         navbar_links = {}
-        soup = self.get_soup(url)
-        if soup:
-            nav = soup.find('nav')
-            if nav:
-                for link in nav.find_all("a", href=True):
-                    text = link.get_text(strip=True)
-                    text_lower = text.lower()
-                    href = link["href"]
-                    full_url = self.get_full_url(href)
-                    if any(keyword in text_lower for keyword in keywords):
-                        if not self.is_excluded_link(text_lower, full_url):
-                            navbar_links[text_lower] = full_url
+        page = self.get_page(url)
+        if page:
+            if page.has_nav:
+                for anchor in page.anchors:
+                    if anchor.in_nav and section in anchor.sections and not anchor.excluded:
+                        navbar_links[anchor.text_lower] = anchor.url
             else:
                 print("Navigation menu not found.")
         return navbar_links
 
-    def explore_and_scrape(self, url, keywords, current_depth=0, max_depth=1):
+    def crawl(self, seeds):
+        """
+        Breadth-first crawl from the given seed items using a shared frontier drained by crawl_workers threads.
+        Each URL is explored at most once, and PDFs found on the way are downloaded and extracted by a
+        PDFPipeline while the crawl continues. Once the frontier is empty and the PDFs are processed, the
+        explored pages are assembled into the nested { "url", "content", "pdfs", "links" } structure under
+        their section in self.data. Each section is assembled as soon as nothing of it is left to process.
+        """
+        self.pdf_pipeline = PDFPipeline(self.pdf_processor, extract_pdfs=self.extract_pdfs)
+        frontier = queue.Queue()
+        for item in seeds:
+            self.enqueue(frontier, item)
+
+        def worker():
+            while True:
+                item = frontier.get()
+                try:
+                    if item is None:
+                        return
+                    if self.explore_page(item, frontier):
+                        with self.lock:
+                            self.crawled_items.append(item)
+                except Exception as e:
+                    print(f"Error exploring {item.url}: {e}")
+                finally:
+                    if item is not None:
+                        self.track_section(item.section, -1)
+                    frontier.task_done()
+
+        workers = [
+            threading.Thread(target=worker, name=f"crawl-worker-{i}", daemon=True)
+            for i in range(self.crawl_workers)
+        ]
+        for thread in workers:
+            thread.start()
+
+        frontier.join()
+        for _ in workers:
+            frontier.put(None)
+        for thread in workers:
+            thread.join()
+        self.pdf_pipeline.shutdown()
+
+        # Sections finish in any order; keep them in keyword order
+        ordered = {section: self.data.pop(section) for section in self.keywords if section in self.data}
+        ordered.update(self.data)
+        self.data = ordered
+
+    def enqueue(self, frontier, item):
+        self.track_section(item.section, 1)
+        frontier.put(item)
+
+    def track_section(self, section, delta):
+        """
+        Count a frontier item or PDF of the section in (+1) or out (-1), and finish the section once none are left.
+        Items only spawn items of their own section, so a section whose count drops to zero is complete.
+        """
+        with self.lock:
+            self.section_pending[section] += delta
+            finished = self.section_pending[section] == 0
+        if finished:
+            self.finish_section(section)
+
+    def finish_section(self, section):
+        """
+        Assemble the crawled pages of a completed section into self.data and report it to on_section.
+        """
+        with self.lock:
+            items = [item for item in self.crawled_items if item.section == section]
+
+        # Attach PDFs to the page they were found on, in the order they were found
+        for item in items:
+            for future in item.pdf_futures:
+                try:
+                    pdf_info = future.result()
+                except Exception as e:
+                    print(f"Error processing PDF linked from {item.url}: {e}")
+                    continue
+                if pdf_info:
+                    item.page_data["pdfs"].append(pdf_info)
+
+        # Attach pages in discovery order so the result does not depend on which worker finished first
+        section_data = {}
+        for item in sorted(items, key=lambda crawled: crawled.sequence):
+            if item.parent is None:
+                section_data[item.link_text] = item.page_data
+            else:
+                item.parent.page_data["links"][item.link_text] = item.page_data
+        if not section_data:
+            return
+
+        with self.lock:
+            self.data[section] = section_data
+        if self.on_section:
+            try:
+                self.on_section(section, section_data)
+            except Exception as e:
+                print(f"Error reporting section {section}: {e}")
+
+    def explore_page(self, item, frontier):
         """
-        Recursively explore a webpage to extract textual content, PDFs, and nested links,
-        stopping if the URL has been visited or the max depth is reached.
-        Returns a dict: { "url", "content", "pdfs", "links" }.
+        Extract textual content from a single frontier item's page, submit its PDFs to the pipeline and
+        queue its relevant nested links.
+        Returns False if the URL was already explored, is beyond max depth or could not be fetched.
         """
-        if url in self.explored_urls or current_depth > max_depth:
-            return None # Stop recursion if the URL is already visited or max depth is reached
+        if item.depth > item.max_depth or not self.claim_url(item.url, self.explored_urls):
+            return False
+
+        print(f"Exploring: {item.url}")
 
-        print(f"Exploring: {url}")
-        self.explored_urls.add(url) # Mark the URL as visited
+        page = self.get_page(item.url)
+        if not page:
+            return False
 
         page_data = {
-            "url": url,
-            "content": "",
+            "url": item.url,
+            "content": page.content,
             "pdfs": [],
             "links": {}
         }
 
-        soup = self.get_soup(url)
-        if not soup:
-            return None
-
-        page_data["content"] = "\n".join(p.get_text(strip=True) for p in soup.find_all("p"))
-
-        # Identify and process PDFs (in parallel if needed)
-        page_pdf_links = self.find_pdfs_on_page(soup, keywords)
+        # Identify PDFs and hand them to the pipeline without waiting for them
+        page_pdf_links = self.find_pdfs_on_page(page)
         for pdf_url in page_pdf_links:
-            pdf_info = self.pdf_processor.process_pdf(pdf_url, extract_pdfs=self.extract_pdfs)
-            if pdf_info:
-                page_data["pdfs"].append(pdf_info)
-
-        if current_depth < max_depth:
-            self.explore_nested_links(soup, keywords, current_depth, max_depth, page_data)
-
-        return page_data
-
-    # Recursively explore nested links within the current page
-    def explore_nested_links(self, soup, keywords, current_depth, max_depth, page_data):
-        for link in soup.find_all("a", href=True):
-            link_text = link.get_text(strip=True)
-            link_text_lower = link_text.lower()
-            full_url = self.get_full_url(link["href"])
-
-            if (
-                full_url not in self.explored_urls
-                and not self.is_excluded_link(link_text_lower, full_url)
-                and any(keyword in link_text_lower for keyword in keywords)
-            ):
-                nested_content = self.explore_and_scrape(full_url, keywords, current_depth + 1, max_depth)
-                if nested_content:
-                    page_data["links"][link_text] = nested_content
-
-    def find_pdfs_on_page(self, soup, keywords):
+            self.track_section(item.section, 1)
+            future = self.pdf_pipeline.submit(pdf_url)
+            future.add_done_callback(lambda _, section=item.section: self.track_section(section, -1))
+            item.pdf_futures.append(future)
+
+        item.page_data = page_data
+
+        # Queue nested links within the current page
+        if item.depth < item.max_depth:
+            for anchor in page.anchors:
+                if (
+                    anchor.url not in self.explored_urls
+                    and not anchor.excluded
+                    and item.section in anchor.sections
+                ):
+                    self.enqueue(frontier, item.child(anchor.url, anchor.text))
+
+        return True
+
+    def claim_url(self, url, seen_urls):
+        """
+        Atomically mark a URL as seen. Returns False if another worker already claimed it.
+        """
+        with self.lock:
+            if url in seen_urls:
+                return False
+            seen_urls.add(url)
+            return True
+
+    def find_pdfs_on_page(self, page):
         """
         Identify PDF links on a webpage (by .pdf extension or by content type check).
-        Uses parallel HEAD requests only when needed.
+        Probes links only when needed.
         """
         pdf_urls = []
         potential_pdf_links = []
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
-            text_lower = link.get_text(strip=True).lower()
-            full_url = self.get_full_url(href)
-
-            if full_url in self.pdf_checked_urls: # Skip already checked URLs
+        for anchor in page.anchors:
+            if not self.claim_url(anchor.url, self.pdf_checked_urls): # Skip already checked URLs
                 continue
-            self.pdf_checked_urls.add(full_url) # Mark the URL as checked
 
-            if self.is_excluded_link(text_lower, full_url):
+            if anchor.excluded:
                 continue
 
             # If it ends with .pdf, no need for HEAD
-            if href.lower().endswith(".pdf"):
-                pdf_urls.append(full_url)
+            if anchor.is_pdf:
+                pdf_urls.append(anchor.url)
                 continue
 
             # If text suggests a PDF, we collect it for HEAD check
-            if 'pdf' in text_lower or 'download' in text_lower \
-                    or any(kw in text_lower for kw in self.keywords.get('reports', [])):
-                potential_pdf_links.append(full_url)
+            if anchor.pdf_likely:
+                potential_pdf_links.append(anchor.url)
 
-        # Run HEAD checks in parallel
-        pdf_urls += self._check_potential_pdfs(potential_pdf_links)
+        # Run HEAD checks concurrently through the shared probe service
+        pdf_urls += pdf_probe.probe_many(potential_pdf_links, headers=self.headers)
         return pdf_urls
 
-    def _check_potential_pdfs(self, links):
+    def get_full_url(self, href):
+        return href if href.startswith("http") else f"{self.base_url}/{href.lstrip('/')}"
+
+    def classify_anchor(self, href, text, in_nav):
         """
-        Perform parallel HEAD requests for suspected PDF links.
-        Returns a list of links confirmed to be PDFs.
+        Resolve and classify a link once, so every consumer of the page can read the result.
         """
-        confirmed_pdfs = []
-
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = {
-                executor.submit(self._check_pdf_head, link): link
-                for link in links
-            }
-            for future in as_completed(futures):
-                link = futures[future]
-                try:
-                    if future.result():
-                        confirmed_pdfs.append(link)
-                except Exception as e:
-                    print(f"Error checking {link}: {e}")
-
-        return confirmed_pdfs
-
-    def _check_pdf_head(self, url):
+        text_lower = text.lower()
+        full_url = self.get_full_url(href)
+
+        # One scan over "text url" finds the exclusions in either part and the sections matched by the text
+        sections = set()
+        excluded = False
+        for end, labels in self.matcher.iter_matches(f"{text_lower} {full_url}".lower()):
+            if wk.EXCLUDED in labels:
+                excluded = True
+            if end <= len(text_lower):
+                sections |= labels
+        sections.discard(wk.EXCLUDED)
+
+        pdf_likely = 'pdf' in text_lower or 'download' in text_lower or 'reports' in sections
+        return Anchor(
+            href=href,
+            url=full_url,
+            text=text,
+            text_lower=text_lower,
+            in_nav=in_nav,
+            excluded=excluded,
+            sections=frozenset(sections),
+            is_pdf=href.lower().endswith(".pdf"),
+            pdf_likely=pdf_likely
+        )
+
+    def parse_page(self, url, html):
         """
-        Check if a URL is a PDF by HEAD request (content type).
+        Parse a page in a single pass into its paragraph text and classified anchors.
         """
-        try:
-            head = requests.head(url, headers=self.headers, allow_redirects=True, timeout=10)
-            return 'pdf' in head.headers.get('Content-Type', '').lower()
-        except Exception:
-            return False
-
-    def is_excluded_link(self, text, url):
-        combined_text = f"{text} {url}"
-        return any(keyword in combined_text.lower() for keyword in self.exclusion_keywords)
+        parsed = self.html_parser.parse(html)
+        anchors = [self.classify_anchor(href, text, in_nav) for href, text, in_nav in parsed.links]
+        return ParsedPage(url, parsed.paragraphs, anchors, has_nav=parsed.has_nav)
 
-    def get_full_url(self, href):
-        return href if href.startswith("http") else f"{self.base_url}/{href.lstrip('/')}"
+    def get_page(self, url):
+        """
+        Return the parsed page for a URL, fetching and parsing it only once per job.
+        """
+        return self.page_cache.get_or_load(url, self._fetch_page)
 
-    def get_soup(self, url):
+    def _fetch_page(self, url):
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.fetcher.get(url, headers=self.headers, timeout=10)
             response.raise_for_status()
-            return BeautifulSoup(response.text, "html.parser")
-        except requests.exceptions.RequestException as e:
+            return self.parse_page(url, response.text), len(response.content)
+        except httpx.HTTPError as e:
             print(f"Error fetching {url}: {e}")
-            return None
+            return None, 0
 
     def save_to_json(self, output_file):
         self.pdf_processor.save_to_json(self.data, output_file)
@@ -247,7 +401,7 @@ class CompanyWebsiteScraper:
 
 if __name__ == "__main__":
     company_name = sys.argv[1]
-    csv_file_path = "app/scraper/filtered_companies_canada.csv"
+    csv_file_path = settings.COMPANY_CSV_PATH
 
     # Fetch the company's website URL
     company_url = "https://" + get_company_website(company_name, csv_file_path)
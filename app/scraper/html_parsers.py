@@ -0,0 +1,135 @@
+from bs4 import BeautifulSoup
+
+from app.core.config import settings
+
+# Elements whose text BeautifulSoup's get_text() leaves out, so the fast backends leave it out as well
+NON_TEXT_TAGS = ("script", "style")
+
+
+class ParsedHtml:
+    """
+    Backend-neutral result of parsing a page: the text of each <p>, every link as (href, text, in_nav) and
+    whether the page has a <nav> element. Texts follow BeautifulSoup's get_text(strip=True): every text node
+    stripped, empty ones dropped, the rest joined without a separator.
+
+    The backends agree on well-formed pages but not on malformed ones: selectolax (lexbor) and lxml (libxml2)
+    repair the markup like a browser, whereas bs4's html.parser keeps tags open until they are closed. Known
+    differences:
+
+    - Unclosed <p>: for "<p>a<p>b" bs4 nests the second paragraph in the first and gives ["ab", "b"]; the fast
+      backends close the first one and give ["a", "b"].
+    - Nested <a>: bs4 keeps the inner link inside the outer one, so the outer link's text is "outerinner"; the
+      fast backends close the outer link first and give "outer".
+    - <template>: bs4 keeps its elements but with empty texts; lxml treats it as page content; selectolax leaves
+      it out entirely.
+
+    bs4 is therefore the default HTML_PARSER and the fast backends are opt-in; benchmarks/html_parser_benchmark.py
+    shows how far they differ on given pages.
+    """
+
+    __slots__ = ("paragraphs", "links", "has_nav")
+
+    def __init__(self, paragraphs, links, has_nav):
+        self.paragraphs = paragraphs
+        self.links = links
+        self.has_nav = has_nav
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ParsedHtml)
+            and (self.paragraphs, self.links, self.has_nav) == (other.paragraphs, other.links, other.has_nav)
+        )
+
+
+class Bs4Parser:
+    """Pure Python BeautifulSoup parser; slowest, but always available."""
+
+    name = "bs4"
+
+    def parse(self, html):
+        soup = BeautifulSoup(html, "html.parser")
+        nav = soup.find("nav")
+        nav_links = {id(link) for link in nav.find_all("a", href=True)} if nav else set()
+        links = [
+            (link["href"], link.get_text(strip=True), id(link) in nav_links)
+            for link in soup.find_all("a", href=True)
+        ]
+        paragraphs = [p.get_text(strip=True) for p in soup.find_all("p")]
+        return ParsedHtml(paragraphs, links, has_nav=nav is not None)
+
+
+class LxmlParser:
+    """libxml2 based parser from lxml."""
+
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        self.lxml_html = lxml.html
+        self.parser = lxml.html.HTMLParser(encoding="utf-8")
+
+    def parse(self, html):
+        try:
+            # Parse bytes so documents carrying an XML encoding declaration are accepted
+            root = self.lxml_html.fromstring(html.encode("utf-8"), parser=self.parser)
+        except Exception:
+            return ParsedHtml([], [], has_nav=False)
+
+        nav = next(root.iter("nav"), None)
+        nav_links = set(nav.iter("a")) if nav is not None else set()
+        links = [
+            (link.get("href"), self._text(link), link in nav_links)
+            for link in root.iter("a") if link.get("href") is not None
+        ]
+        paragraphs = [self._text(p) for p in root.iter("p")]
+        return ParsedHtml(paragraphs, links, has_nav=nav is not None)
+
+    @classmethod
+    def _text(cls, element):
+        return "".join(stripped for part in cls._text_nodes(element) if part and (stripped := part.strip()))
+
+    @classmethod
+    def _text_nodes(cls, element):
+        # Comments and processing instructions have non-string tags; only their tail is page text
+        if isinstance(element.tag, str) and element.tag not in NON_TEXT_TAGS:
+            yield element.text
+            for child in element:
+                yield from cls._text_nodes(child)
+                yield child.tail
+
+
+class SelectolaxParser:
+    """lexbor based parser from selectolax; the fastest backend."""
+
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self.parser_class = LexborHTMLParser
+
+    def parse(self, html):
+        tree = self.parser_class(html)
+        tree.strip_tags(list(NON_TEXT_TAGS))
+        nav = tree.css_first("nav")
+        nav_links = {link.mem_id for link in nav.css("a[href]")} if nav else set()
+        links = [
+            (link.attributes.get("href") or "", link.text(strip=True), link.mem_id in nav_links)
+            for link in tree.css("a[href]")
+        ]
+        paragraphs = [p.text(strip=True) for p in tree.css("p")]
+        return ParsedHtml(paragraphs, links, has_nav=nav is not None)
+
+
+PARSERS = {parser.name: parser for parser in (SelectolaxParser, LxmlParser, Bs4Parser)}
+
+# Returns the named HTML parser backend. "auto" picks the fastest one installed, falling back to bs4; the output
+# may then differ from bs4 on malformed pages.
+def get_html_parser(name=None):
+    name = name or settings.HTML_PARSER
+    if name != "auto":
+        return PARSERS[name]()
+    for parser_class in PARSERS.values():
+        try:
+            return parser_class()
+        except ImportError:
+            continue
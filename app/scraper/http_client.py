@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import os
+import threading
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# How far into a download the magic bytes are looked for
+MAGIC_WINDOW = 1024
+
+
+class DownloadError(Exception):
+    """Raised when a streamed download is rejected for its size or content."""
+
+
+class HttpFetcher:
+    """
+    Shared asyncio HTTP engine used by the scrapers for every page, HEAD and PDF request.
+
+    A single pooled httpx.AsyncClient (HTTP/2 with keep-alive) runs on an event loop in a background thread,
+    so connections are reused across pages, jobs and threads. Requests are bounded by a global concurrency
+    limit and a per-host limit. Coroutines (aget, ahead) can be awaited on the fetcher's loop; the blocking
+    wrappers (get, head) can be called from any other thread.
+    """
+
+    def __init__(
+        self,
+        max_connections=None,
+        max_concurrency=None,
+        per_host_concurrency=None,
+        timeout=None,
+        http2=None
+    ):
+        self.max_connections = max_connections or settings.HTTP_MAX_CONNECTIONS
+        self.max_concurrency = max_concurrency or settings.HTTP_MAX_CONCURRENCY
+        self.per_host_concurrency = per_host_concurrency or settings.HTTP_PER_HOST_CONCURRENCY
+        self.timeout = timeout or settings.HTTP_TIMEOUT
+        self.http2 = settings.HTTP2_ENABLED if http2 is None else http2
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="http-fetcher", daemon=True)
+        self.thread.start()
+        self.run(self._start())
+
+    async def _start(self):
+        # Semaphores and the client are created on the fetcher's own loop
+        self.global_limit = asyncio.Semaphore(self.max_concurrency)
+        self.host_limits = {}
+        self.client = httpx.AsyncClient(
+            http2=self.http2,
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            )
+        )
+
+    @asynccontextmanager
+    async def limit(self, url):
+        """
+        Hold a global and a per-host concurrency slot for the duration of a request.
+        """
+        host = urlsplit(url).netloc.lower()
+        host_limit = self.host_limits.get(host)
+        if host_limit is None:
+            host_limit = self.host_limits[host] = asyncio.Semaphore(self.per_host_concurrency)
+        async with host_limit, self.global_limit:
+            yield
+
+    async def aget(self, url, headers=None, timeout=None):
+        async with self.limit(url):
+            return await self.client.get(url, headers=headers, timeout=timeout or self.timeout)
+
+    async def ahead(self, url, headers=None, timeout=None):
+        async with self.limit(url):
+            return await self.client.head(url, headers=headers, timeout=timeout or self.timeout)
+
+    async def apeek(self, url, size, headers=None, timeout=None):
+        """
+        Request the first bytes of a resource with a Range header and stop reading after size bytes, even
+        from servers that ignore the range. Returns (response, first bytes).
+        """
+        headers = {**(headers or {}), "Range": f"bytes=0-{size - 1}"}
+        async with self.limit(url):
+            async with self.client.stream("GET", url, headers=headers, timeout=timeout or self.timeout) as response:
+                head = b""
+                if response.is_success:
+                    async for chunk in response.aiter_bytes():
+                        head += chunk
+                        if len(head) >= size:
+                            break
+                return response, head[:size]
+
+    async def adownload(self, url, path, headers=None, timeout=None, max_bytes=None, magic=None, chunk_size=None):
+        """
+        Stream a response body to a file in chunks, hashing it on the way.
+        Aborts with DownloadError as soon as the body exceeds max_bytes, or when magic is given and does not
+        appear in the first MAGIC_WINDOW bytes. Returns (sha256 hex digest, size in bytes). A partial file is
+        removed on any failure.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        async with self.limit(url):
+            async with self.client.stream("GET", url, headers=headers, timeout=timeout or self.timeout) as response:
+                response.raise_for_status()
+                content_length = response.headers.get("Content-Length", "")
+                if max_bytes and content_length.isdigit() and int(content_length) > max_bytes:
+                    raise DownloadError(f"{url} is {content_length} bytes, over the {max_bytes} byte limit")
+
+                try:
+                    with open(path, "wb") as f:
+                        head = b""
+                        checked = magic is None
+                        async for chunk in response.aiter_bytes(chunk_size or settings.HTTP_CHUNK_SIZE):
+                            size += len(chunk)
+                            if max_bytes and size > max_bytes:
+                                raise DownloadError(f"{url} exceeds the {max_bytes} byte limit")
+                            if not checked:
+                                head += chunk
+                                if len(head) < MAGIC_WINDOW:
+                                    continue
+                                self._check_magic(url, head, magic)
+                                checked = True
+                                chunk, head = head, b""
+                            await asyncio.to_thread(self._write_chunk, f, digest, chunk)
+
+                        if not checked:
+                            self._check_magic(url, head, magic)
+                            await asyncio.to_thread(self._write_chunk, f, digest, head)
+                except BaseException:
+                    if os.path.exists(path):
+                        os.remove(path)
+                    raise
+        return digest.hexdigest(), size
+
+    @staticmethod
+    def _check_magic(url, head, magic):
+        if magic not in head[:MAGIC_WINDOW]:
+            raise DownloadError(f"{url} has no {magic!r} signature in its first {MAGIC_WINDOW} bytes")
+
+    @staticmethod
+    def _write_chunk(f, digest, chunk):
+        digest.update(chunk)
+        f.write(chunk)
+
+    def run(self, coroutine):
+        """
+        Run a coroutine on the fetcher's loop and block until it finishes.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def get(self, url, headers=None, timeout=None):
+        return self.run(self.aget(url, headers=headers, timeout=timeout))
+
+    def head(self, url, headers=None, timeout=None):
+        return self.run(self.ahead(url, headers=headers, timeout=timeout))
+
+    def download(self, url, path, headers=None, timeout=None, max_bytes=None, magic=None, chunk_size=None):
+        return self.run(self.adownload(url, path, headers, timeout, max_bytes, magic, chunk_size))
+
+    def close(self):
+        self.run(self.client.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+# Returns the process-wide fetcher, starting it on first use
+def get_fetcher():
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = HttpFetcher()
+        return _fetcher
+
+# Closes the process-wide fetcher and its pooled connections
+def close_fetcher():
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is not None:
+            _fetcher.close()
+            _fetcher = None
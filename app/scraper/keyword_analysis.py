@@ -0,0 +1,40 @@
+from functools import lru_cache
+
+from app.util.keyword_matcher import KeywordMatcher
+
+
+class KeywordAnalyzer:
+    """
+    Finds the lines of a document that mention any of a list of keywords.
+
+    The keywords are compiled once into a KeywordMatcher; each page is then lowercased and split into lines
+    once and scanned in a single pass, whatever the number of keywords. Matching is case-insensitive.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))
+        self.matcher = KeywordMatcher({keyword: [keyword] for keyword in self.keywords})
+
+    def analyse_pages(self, pages, stop_when_all_found=False):
+        """
+        Consume (page_number, text) pairs and return { keyword: [(page_number, stripped line), ...] } in
+        keyword order, leaving out keywords with no match. With stop_when_all_found, no further pages are
+        read once every keyword has matched at least once.
+        """
+        matches = {}
+        for page_number, text in pages:
+            for line, lowered_line in zip(text.splitlines(), text.lower().splitlines()):
+                labels = self.matcher.match(lowered_line)
+                if labels:
+                    stripped = line.strip()
+                    for keyword in labels:
+                        matches.setdefault(keyword, []).append((page_number, stripped))
+            if stop_when_all_found and len(matches) == len(self.keywords):
+                break
+        return {keyword: matches[keyword] for keyword in self.keywords if keyword in matches}
+
+
+# Returns a compiled analyzer for the keywords, reusing it across documents
+@lru_cache(maxsize=16)
+def get_keyword_analyzer(keywords):
+    return KeywordAnalyzer(keywords)
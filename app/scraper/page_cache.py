@@ -0,0 +1,64 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from app.core.config import settings
+from app.util.url_utils import normalize_url
+
+
+class PageCache:
+    """
+    Per-job LRU cache of fetched and parsed pages, keyed by normalized URL.
+
+    The cache is bounded by number of entries and by the total size of the fetched documents. When several
+    threads ask for the same URL at once, only the first one loads it and the others wait for its result, so
+    each URL is fetched and parsed at most once while it stays cached. Failed fetches are cached as None.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None):
+        self.max_entries = max_entries or settings.PAGE_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or settings.PAGE_CACHE_MAX_BYTES
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get_or_load(self, url, loader):
+        """
+        Return the cached page for the URL, calling loader(url) -> (page, size_in_bytes) on a miss.
+        """
+        key = normalize_url(url)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+            future = self.in_flight.get(key)
+            is_loader = future is None
+            if is_loader:
+                future = self.in_flight[key] = Future()
+
+        if not is_loader:
+            return future.result()
+
+        try:
+            page, size = loader(url)
+        except BaseException as e:
+            with self.lock:
+                del self.in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            del self.in_flight[key]
+            self._store(key, page, size)
+        future.set_result(page)
+        return page
+
+    def _store(self, key, page, size):
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (page, size)
+        self.total_bytes += size
+        while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_size
@@ -0,0 +1,39 @@
+class Anchor:
+    """
+    A link found on a page, classified once when the page is parsed.
+
+    Holds the absolute URL, the link text (as displayed and lowercased), whether the link is excluded,
+    the keyword sections its text matches, whether it points to a .pdf file and whether it looks like a PDF
+    worth probing. in_nav is set for links inside the page's first <nav> element.
+    """
+
+    __slots__ = ("href", "url", "text", "text_lower", "in_nav", "excluded", "sections", "is_pdf", "pdf_likely")
+
+    def __init__(self, href, url, text, text_lower, in_nav, excluded, sections, is_pdf, pdf_likely):
+        self.href = href
+        self.url = url
+        self.text = text
+        self.text_lower = text_lower
+        self.in_nav = in_nav
+        self.excluded = excluded
+        self.sections = sections
+        self.is_pdf = is_pdf
+        self.pdf_likely = pdf_likely
+
+
+class ParsedPage:
+    """
+    A fetched page reduced to what the scraper reads from it: paragraph text and classified anchors.
+    """
+
+    __slots__ = ("url", "paragraphs", "anchors", "has_nav")
+
+    def __init__(self, url, paragraphs, anchors, has_nav):
+        self.url = url
+        self.paragraphs = paragraphs
+        self.anchors = anchors
+        self.has_nav = has_nav
+
+    @property
+    def content(self):
+        return "\n".join(self.paragraphs)
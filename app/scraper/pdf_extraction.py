@@ -0,0 +1,130 @@
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PyPDF2 import PdfReader
+
+from app.core.config import settings
+
+# Count the pages of a PDF
+def count_pages(pdf_path):
+    with open(pdf_path, 'rb') as f:
+        return len(PdfReader(f).pages)
+
+# Extract the text of pages [start, stop) of a PDF; runs inside the worker processes
+def extract_page_range(pdf_path, start, stop):
+    with open(pdf_path, 'rb') as f:
+        reader = PdfReader(f)
+        return [reader.pages[number].extract_text() or "" for number in range(start, stop)]
+
+# Lazily yield (page_number, text) for pages [start, stop) of a PDF, extracting each page only when asked for
+def iter_page_range(pdf_path, start, stop):
+    with open(pdf_path, 'rb') as f:
+        reader = PdfReader(f)
+        for number in range(start, stop):
+            yield number + 1, reader.pages[number].extract_text() or ""
+
+
+class PdfTextExtractor:
+    """
+    Extracts PDF text on a long-lived process pool, so the CPU-bound PyPDF2 work of large documents is
+    spread across cores instead of running under the GIL of the calling thread.
+
+    A document's pages are split into contiguous ranges, each extracted by a worker, and the results are
+    yielded lazily in page order. Only a bounded number of ranges run ahead of the consumer, so a consumer
+    that stops early does not pay for the rest of the document. Documents shorter than min_parallel_pages,
+    or any document on a single-core machine, are extracted in-process one page at a time. At most max_documents
+    documents are extracted at once; further documents wait for a free slot.
+    """
+
+    def __init__(self, max_workers=None, pages_per_chunk=None, min_parallel_pages=None, max_documents=None):
+        self.max_workers = max_workers or settings.PDF_EXTRACTION_WORKERS or os.cpu_count() or 1
+        self.document_slots = threading.BoundedSemaphore(max_documents or settings.PDF_EXTRACTION_MAX_CONCURRENCY)
+        self.pages_per_chunk = pages_per_chunk or settings.PDF_PAGES_PER_CHUNK
+        self.min_parallel_pages = min_parallel_pages or settings.PDF_MIN_PARALLEL_PAGES
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def get_pool(self):
+        with self.lock:
+            if self.pool is None:
+                # Spawned rather than forked: the API process runs several threads
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self.pool
+
+    def page_ranges(self, page_count):
+        chunk_size = max(1, min(self.pages_per_chunk, math.ceil(page_count / self.max_workers)))
+        return [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+
+    def iter_pages(self, pdf_path, max_pages=None, max_seconds=None, page_count=None):
+        """
+        Lazily yield (page_number, text) for the PDF's pages in order, starting at page 1.
+        Stops after max_pages pages, or at the first page boundary after max_seconds have passed.
+        """
+        # Bound how many documents are extracted at once across all jobs
+        with self.document_slots:
+            page_count = count_pages(pdf_path) if page_count is None else page_count
+            stop = min(page_count, max_pages) if max_pages else page_count
+            deadline = time.monotonic() + max_seconds if max_seconds else None
+
+            if stop < self.min_parallel_pages or self.max_workers == 1:
+                pages = iter_page_range(pdf_path, 0, stop)
+            else:
+                pages = self._iter_pages_in_pool(pdf_path, stop)
+
+            with closing(pages):
+                for page in pages:
+                    yield page
+                    if deadline and time.monotonic() >= deadline:
+                        return
+
+    def _iter_pages_in_pool(self, pdf_path, stop):
+        ranges = deque(self.page_ranges(stop))
+        pending = deque()
+        pool = None
+        # Index of the first page not yielded yet
+        next_page = 0
+        try:
+            pool = self.get_pool()
+            while ranges or pending:
+                while ranges and len(pending) < self.max_workers:
+                    start, end = ranges.popleft()
+                    pending.append((start, pool.submit(extract_page_range, pdf_path, start, end)))
+                start, future = pending.popleft()
+                for offset, text in enumerate(future.result()):
+                    yield start + offset + 1, text
+                    next_page = start + offset + 1
+        except BrokenProcessPool:
+            # A worker died, possibly while extracting another document; start a fresh pool next time and
+            # extract the rest of this document in-process
+            self._discard_pool(pool)
+            yield from iter_page_range(pdf_path, next_page, stop)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    # Drop a broken pool, unless another thread has already replaced it with a fresh one
+    def _discard_pool(self, pool):
+        with self.lock:
+            if pool is None or self.pool is not pool:
+                return
+            self.pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait=True):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=wait, cancel_futures=True)
+                self.pool = None
+
+
+pdf_extractor = PdfTextExtractor()
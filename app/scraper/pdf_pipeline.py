@@ -0,0 +1,58 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.core.config import settings
+
+
+class PDFPipeline:
+    """
+    Bounded two-stage pipeline for PDFs discovered while a website is being crawled.
+
+    Downloads run on one pool and text extraction on another, both concurrently with the HTML crawl, so
+    a page never waits for its PDFs before the crawl moves on. submit() returns a Future resolving to the
+    PDF's info dict, or None if it could not be downloaded or processed.
+    """
+
+    def __init__(self, pdf_processor, extract_pdfs=True, download_workers=None, extraction_workers=None):
+        self.pdf_processor = pdf_processor
+        self.extract_pdfs = extract_pdfs
+        self.download_executor = ThreadPoolExecutor(
+            max_workers=download_workers or settings.PDF_DOWNLOAD_WORKERS,
+            thread_name_prefix="pdf-download"
+        )
+        self.extraction_executor = ThreadPoolExecutor(
+            max_workers=extraction_workers or settings.PDF_PROCESSING_WORKERS,
+            thread_name_prefix="pdf-extraction"
+        )
+
+    def submit(self, pdf_url):
+        result = Future()
+
+        def extract(download_future):
+            download = download_future.result()
+            if download is None:
+                result.set_result(None)
+                return
+            extraction = self.extraction_executor.submit(self.pdf_processor.extract_pdf, download, self.extract_pdfs)
+            extraction.add_done_callback(lambda extraction_future: self._resolve(result, extraction_future))
+
+        download = self.download_executor.submit(self.pdf_processor.download_pdf, pdf_url)
+        download.add_done_callback(lambda download_future: self._run_stage(result, extract, download_future))
+        return result
+
+    @staticmethod
+    def _run_stage(result, stage, future):
+        try:
+            stage(future)
+        except Exception as e:
+            result.set_exception(e)
+
+    @staticmethod
+    def _resolve(result, future):
+        try:
+            result.set_result(future.result())
+        except Exception as e:
+            result.set_exception(e)
+
+    def shutdown(self, wait=True):
+        self.download_executor.shutdown(wait=wait)
+        self.extraction_executor.shutdown(wait=wait)
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+import httpx
+
+from app.core.config import settings
+from app.scraper.http_client import get_fetcher
+
+PDF_MAGIC = b"%PDF-"
+
+# Status codes of servers that do not support HEAD for a resource
+HEAD_UNSUPPORTED = {403, 405, 501}
+
+
+class PdfProbe:
+    """
+    Long-lived service checking whether URLs serve PDFs, shared by every crawl in the process.
+
+    URLs are probed concurrently on the shared HttpFetcher loop with a HEAD request and its Content-Type.
+    When a server rejects HEAD or omits the Content-Type, the probe falls back to a GET of the first bytes
+    (Range: bytes=0-7) and sniffs the %PDF- signature. Verdicts are kept in an LRU cache for ttl seconds;
+    probes that failed on network errors are not cached.
+    """
+
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = ttl or settings.PDF_PROBE_TTL_SECONDS
+        self.max_entries = max_entries or settings.PDF_PROBE_CACHE_SIZE
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def probe_many(self, urls, headers=None):
+        """
+        Returns the URLs confirmed to be PDFs, in the order given.
+        """
+        verdicts = {}
+        to_probe = []
+        now = time.monotonic()
+        with self.lock:
+            for url in dict.fromkeys(urls):
+                cached = self.cache.get(url)
+                if cached and cached[1] > now:
+                    self.cache.move_to_end(url)
+                    verdicts[url] = cached[0]
+                else:
+                    to_probe.append(url)
+
+        if to_probe:
+            fetcher = get_fetcher()
+            results = fetcher.run(self._probe_all(fetcher, to_probe, headers))
+            expires = time.monotonic() + self.ttl
+            with self.lock:
+                for url, verdict in zip(to_probe, results):
+                    verdicts[url] = bool(verdict)
+                    if verdict is not None:
+                        self._store(url, verdict, expires)
+
+        return [url for url in urls if verdicts.get(url)]
+
+    async def _probe_all(self, fetcher, urls, headers):
+        return await asyncio.gather(*(self._probe(fetcher, url, headers) for url in urls))
+
+    async def _probe(self, fetcher, url, headers):
+        # Returns True or False, or None when the server could not be reached
+        try:
+            head = await fetcher.ahead(url, headers=headers)
+            content_type = head.headers.get("Content-Type", "").lower()
+            if head.is_success and content_type:
+                return "pdf" in content_type
+            if not head.is_success and head.status_code not in HEAD_UNSUPPORTED:
+                return False
+        except httpx.HTTPError:
+            pass
+
+        try:
+            response, first_bytes = await fetcher.apeek(url, len(PDF_MAGIC) + 3, headers=headers)
+        except httpx.HTTPError as e:
+            print(f"Error checking {url}: {e}")
+            return None
+        if not response.is_success:
+            return False
+        return "pdf" in response.headers.get("Content-Type", "").lower() or first_bytes.startswith(PDF_MAGIC)
+
+    def _store(self, url, verdict, expires):
+        self.cache[url] = (verdict, expires)
+        self.cache.move_to_end(url)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+
+pdf_probe = PdfProbe()
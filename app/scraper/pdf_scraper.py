@@ -1,19 +1,34 @@
-import glob
-import hashlib
 import json
 import os
 import shutil
 import time
-import requests
+import uuid
+from contextlib import closing
+
+from app.core.config import settings
+from app.scraper.http_client import get_fetcher
+from app.scraper.keyword_analysis import get_keyword_analyzer
+from app.scraper.pdf_extraction import count_pages, pdf_extractor
+from app.scraper.pdf_store import PDFStore, file_sha256
+
+class DownloadedPdf:
+    """
+    A PDF streamed to disk, with the SHA-256 and size computed while it was written.
+    """
+
+    def __init__(self, url, path, sha256, size):
+        self.url = url
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
 
-from PyPDF2 import PdfReader
 
 class PDFScraper:
     """
     Provides tools for downloading, extracting, analyzing, and managing PDF documents.
 
     Features:
-        - Unique file naming
+        - Content-addressed storage with cached text and keyword analyses
         - Text extraction
         - Keyword-based analysis
         - JSON data saving
@@ -34,6 +49,8 @@ class PDFScraper:
         self.temp_directory = temp_directory
         self.json_directory = json_directory
         self.headers = headers or {"User-Agent": "Mozilla/5.0"}
+        self.fetcher = get_fetcher()
+        self.store = PDFStore()
 
         # Ensure directories exist
         os.makedirs(self.pdf_directory, exist_ok=True)
@@ -42,24 +59,46 @@ class PDFScraper:
 
     def process_pdf(self, pdf_url, extract_pdfs=True):
         """
-        Downloads a PDF from the given URL, saves it with a unique filename, and extracts its text content.
+        Downloads a PDF from the given URL, adds it to the PDF store, and extracts its text content page by
+        page within the PDF_MAX_PAGES and PDF_TIME_BUDGET_SECONDS budgets.
+        Text already extracted from the same bytes is returned from the store.
         Returns a dictionary with PDF metadata and extracted text (if extract_pdfs=True).
         """
+        download = self.download_pdf(pdf_url)
+        if download is None:
+            return None
+        return self.extract_pdf(download, extract_pdfs=extract_pdfs)
+
+    def download_pdf(self, pdf_url):
+        """
+        Download stage of process_pdf. Returns a DownloadedPdf, or None if the download failed.
+        """
         print(f"Processing PDF: {pdf_url}")
+        try:
+            return self._download_pdf_content(pdf_url)
+        except Exception as e:
+            print(f"Error downloading PDF from {pdf_url}: {e}")
+            return None
 
+    def extract_pdf(self, download, extract_pdfs=True):
+        """
+        Extraction stage of process_pdf. Returns a dictionary with PDF metadata and extracted text
+        (if extract_pdfs=True), or None if the PDF could not be stored.
+        """
         try:
-            response = self._download_pdf_content(pdf_url)
             if extract_pdfs:
-                # Generate a unique filename and save the PDF
-                file_path = self._save_pdf_content(response, pdf_url)
+                # Store the PDF under the hash of its content
+                file_path = self.store.add(download.path, download.sha256)
 
-                # Extract text from the PDF
-                text = self._extract_text_from_pdf(file_path)
-                return {"url": pdf_url, "file_path": file_path, "content": text}
+                # Extract text from the PDF, unless these bytes were extracted before
+                with closing(self._iter_pages(file_path, download.sha256)) as pages:
+                    text = "\n".join(page_text for _, page_text in pages)
+                return {"url": download.url, "file_path": file_path, "content": text}
             else:
-                return {"url": pdf_url}
+                os.remove(download.path)
+                return {"url": download.url}
         except Exception as e:
-            print(f"Error downloading PDF from {pdf_url}: {e}")
+            print(f"Error processing PDF from {download.url}: {e}")
             return None
 
     @staticmethod
@@ -69,21 +108,6 @@ class PDFScraper:
         """
         return "".join(c if c.isalnum() or c in (' ', '.', '_') else '_' for c in filename)
 
-    def clear_pdf_directory(self):
-        """Delete and recreate the PDF directory."""
-        shutil.rmtree(self.pdf_directory, ignore_errors=True)
-        os.makedirs(self.pdf_directory)
-
-    def clear_json_directory(self):
-        """Delete and recreate the JSON directory."""
-        shutil.rmtree(self.json_directory, ignore_errors=True)
-        os.makedirs(self.json_directory)
-
-    def clear_temp_directory(self):
-        """Delete and recreate the temporary directory."""
-        shutil.rmtree(self.temp_directory, ignore_errors=True)
-        os.makedirs(self.temp_directory)
-
     def save_to_json(self, data, output_file):
         """
         Save the provided data to a JSON file in the json_directory.
@@ -96,22 +120,38 @@ class PDFScraper:
         except Exception as e:
             print(f"Error saving data to JSON: {e}")
 
-    def analyse_and_extract_pdf(self, pdf_path, keywords):
+    def analyse_and_extract_pdf(self, pdf_path, keywords, with_pages=False):
         """
-        Extract text from a PDF, then search the extracted text for the specified keywords.
-        Returns a dictionary keyed by keyword with lines of text containing that keyword.
+        Extract text from a PDF page by page and search it for the specified keywords, stopping early at the
+        PDF_MAX_PAGES or PDF_TIME_BUDGET_SECONDS budgets, or once every keyword has been found if
+        PDF_STOP_WHEN_ALL_KEYWORDS_FOUND is set.
+        Returns a dictionary keyed by keyword with lines of text containing that keyword, or with
+        {"page", "line"} entries if with_pages=True.
+        Analyses are cached per PDF content, keyword list and budget.
         """
         print(f"Analysing PDF: {pdf_path}")
         extracted_data = {}
         try:
-            text = self._extract_text_from_pdf(pdf_path)
-            for keyword in keywords:
-                matching_lines = [
-                    line.strip() for line in text.splitlines()
-                    if keyword.lower() in line.lower()
-                ]
-                if matching_lines:
-                    extracted_data[keyword] = matching_lines
+            sha256 = file_sha256(pdf_path)
+            variant = f"max_pages={settings.PDF_MAX_PAGES},stop={settings.PDF_STOP_WHEN_ALL_KEYWORDS_FOUND}"
+            hits = self.store.get_analysis(sha256, keywords, variant)
+            if hits is not None:
+                print(f"Using cached analysis for {pdf_path}.")
+            else:
+                started = time.monotonic()
+                with closing(self._iter_pages(pdf_path, sha256)) as pages:
+                    hits = get_keyword_analyzer(tuple(keywords)).analyse_pages(
+                        pages, stop_when_all_found=settings.PDF_STOP_WHEN_ALL_KEYWORDS_FOUND
+                    )
+                # An analysis cut short by the time budget depends on machine load, so it is not cached
+                budget = settings.PDF_TIME_BUDGET_SECONDS
+                if not budget or time.monotonic() - started < budget:
+                    self.store.put_analysis(sha256, keywords, hits, variant)
+
+            extracted_data = {
+                keyword: [{"page": page, "line": line} if with_pages else line for page, line in keyword_hits]
+                for keyword, keyword_hits in hits.items()
+            }
             print(f"Extraction completed for {pdf_path}.")
         except Exception as e:
             print(f"Error analysing {pdf_path}: {e}")
@@ -135,74 +175,56 @@ class PDFScraper:
 
     def rename_and_move_pdf(self, original_path: str, company_name: str) -> str:
         """
-        Rename a PDF file using a unique identifier based on the company name and current time,
-        then move it to the pdf_directory. Returns the new file path.
+        Move a downloaded PDF for the company into the PDF store, named by the SHA-256 of its content.
+        Returns the new file path.
         """
-        unique_id = hashlib.md5(f"{time.time()}_{company_name}".encode()).hexdigest()[:10]
-        new_name = f"{company_name.replace(' ', '_')}_{unique_id}.pdf"
-        new_path = os.path.join(self.pdf_directory, new_name)
-
         try:
-            os.rename(original_path, new_path)
-            print(f"Moved and renamed file to: {new_path}")
+            new_path = self.store.add(original_path)
+            print(f"Stored {company_name} PDF as: {new_path}")
         except Exception as e:
             print(f"Error renaming and moving file: {e}")
             raise
         return new_path
 
-    def combine_json_files(self, output_file="combined_data.json"):
-        """
-        Combine all JSON files in the json_directory into a single JSON file.
-        """
-        combined_data = {}
-        try:
-            json_files = glob.glob(os.path.join(self.json_directory, "*.json"))
-            for json_file in json_files:
-                with open(json_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    combined_data.update(data)
-            self.save_to_json(combined_data, output_file)
-            print(f"Combined JSON data saved to {output_file}")
-        except Exception as e:
-            print(f"Error combining JSON files: {e}")
-
     def _download_pdf_content(self, pdf_url, timeout=30):
         """
-        Internal helper method to download PDF content from a URL.
-        Raises an exception if the request fails.
-        """
-        response = requests.get(pdf_url, headers=self.headers, timeout=timeout)
-        response.raise_for_status()
-        return response
-
-    def _save_pdf_content(self, response, pdf_url):
-        """
-        Internal helper method to create a unique filename and save the PDF content.
-        Returns the full path where the PDF is saved.
-        """
-        file_name = os.path.basename(pdf_url) or "downloaded.pdf"
-        if not file_name.lower().endswith('.pdf'):
-            file_name += '.pdf'
-        unique_id = hashlib.md5(f"{time.time()}_{pdf_url}".encode()).hexdigest()[:10]
-        safe_file_name = self.make_safe_filename(file_name)
-        unique_file_name = f"{unique_id}_{safe_file_name}"
-        pdf_path = os.path.join(self.pdf_directory, unique_file_name)
-
-        with open(pdf_path, "wb") as f:
-            f.write(response.content)
-
-        return pdf_path
-
-    def _extract_text_from_pdf(self, pdf_path):
-        """
-        Internal helper method to read text from a PDF file using PyPDF2.
-        Returns the extracted text as a string.
-        """
-        text = ""
-        try:
-            with open(pdf_path, 'rb') as f:
-                reader = PdfReader(f)
-                text = "\n".join(page.extract_text() or "" for page in reader.pages)
-        except Exception as e:
-            print(f"Error extracting text from {pdf_path}: {e}")
-        return text
+        Internal helper method to stream a PDF from a URL to a partial file in the pdf_directory.
+        Raises an exception if the request fails, the file is larger than PDF_MAX_BYTES or the response
+        is not a PDF.
+        """
+        partial_path = os.path.join(self.pdf_directory, f"{uuid.uuid4().hex}.part")
+        sha256, size = self.fetcher.download(
+            pdf_url,
+            partial_path,
+            headers=self.headers,
+            timeout=timeout,
+            max_bytes=settings.PDF_MAX_BYTES,
+            magic=b"%PDF-"
+        )
+        return DownloadedPdf(pdf_url, partial_path, sha256, size)
+
+    def _iter_pages(self, pdf_path, sha256):
+        """
+        Internal helper method lazily yielding (page_number, text) within the page and time budgets.
+        Pages come from the store's cache when these bytes were extracted before; otherwise they are
+        extracted as they are consumed and cached once the whole document has been read.
+        """
+        max_pages = settings.PDF_MAX_PAGES or None
+        cached_pages = self.store.get_pages(sha256)
+        if cached_pages is not None:
+            yield from enumerate(cached_pages[:max_pages], start=1)
+            return
+
+        page_count = count_pages(pdf_path)
+        pages = []
+        for page_number, text in pdf_extractor.iter_pages(
+            pdf_path,
+            max_pages=max_pages,
+            max_seconds=settings.PDF_TIME_BUDGET_SECONDS or None,
+            page_count=page_count
+        ):
+            pages.append(text)
+            yield page_number, text
+
+        if len(pages) == page_count:
+            self.store.put_pages(sha256, pages)
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from app.core.config import settings
+
+# Compute the SHA-256 of a file without loading it into memory
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PDFStore:
+    """
+    Content-addressed store of PDFs shared by all jobs, keyed by the SHA-256 of their bytes.
+
+    The extracted page texts and keyword analyses of each PDF are cached beside it, so a document that has
+    been seen before (linked from several pages, or fetched again on a later run) is stored once and
+    extracted once. Layout: <root>/<sha[:2]>/<sha>.pdf, <sha>.pages.json and <sha>.<analysis fingerprint>.json.
+
+    Every hit refreshes the modification time of the file read, which serves as the document's last use. At most
+    once per PDF_STORE_PRUNE_INTERVAL_SECONDS, adding a PDF prunes the store: documents unused for longer than
+    PDF_STORE_MAX_AGE_SECONDS are removed with their cached files, then the least recently used ones until the
+    store fits in PDF_STORE_MAX_BYTES. Documents used within the last IN_USE_SECONDS are never evicted, since a
+    job may still be reading them.
+    """
+
+    IN_USE_SECONDS = 3600
+
+    # Last prune time per store root, shared by every PDFStore instance
+    _last_prune = {}
+    _prune_lock = threading.Lock()
+
+    def __init__(self, root=None, max_bytes=None, max_age=None, prune_interval=None):
+        self.root = root or settings.PDF_STORE_DIRECTORY
+        self.max_bytes = settings.PDF_STORE_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_age = settings.PDF_STORE_MAX_AGE_SECONDS if max_age is None else max_age
+        self.prune_interval = settings.PDF_STORE_PRUNE_INTERVAL_SECONDS if prune_interval is None else prune_interval
+
+    def path_for(self, sha256, suffix):
+        return os.path.join(self.root, sha256[:2], f"{sha256}{suffix}")
+
+    def add(self, path, sha256=None):
+        """
+        Move a PDF into the store, or discard it if the same bytes are already stored.
+        Returns the stored path.
+        """
+        sha256 = sha256 or file_sha256(path)
+        stored_path = self.path_for(sha256, ".pdf")
+        if self._touch(stored_path):
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+            shutil.move(path, stored_path)
+            os.utime(stored_path)
+        self._maybe_prune()
+        return stored_path
+
+    def prune(self, now=None):
+        """
+        Evict documents past the max age, then the least recently used ones until the store fits in max_bytes.
+        Returns the number of documents evicted.
+        """
+        now = time.time() if now is None else now
+        entries = {}
+        for directory, _, file_names in os.walk(self.root):
+            for file_name in file_names:
+                path = os.path.join(directory, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                # Temporary files of interrupted writes belong to no document and are removed once stale
+                if file_name.endswith(".tmp"):
+                    if now - stat.st_mtime > self.IN_USE_SECONDS:
+                        self._remove([path])
+                    continue
+                entry = entries.setdefault(file_name.split(".", 1)[0], [0, 0, []])
+                entry[0] = max(entry[0], stat.st_mtime)
+                entry[1] += stat.st_size
+                entry[2].append(path)
+
+        total = sum(size for _, size, _ in entries.values())
+        evicted = 0
+        for last_used, size, paths in sorted(entries.values(), key=lambda entry: entry[0]):
+            if now - last_used < self.IN_USE_SECONDS:
+                break
+            expired = self.max_age and now - last_used > self.max_age
+            if not expired and (not self.max_bytes or total <= self.max_bytes):
+                break
+            self._remove(paths)
+            total -= size
+            evicted += 1
+        return evicted
+
+    def _maybe_prune(self):
+        if not self.max_bytes and not self.max_age:
+            return
+        now = time.time()
+        with self._prune_lock:
+            if now - self._last_prune.get(self.root, 0) < self.prune_interval:
+                return
+            self._last_prune[self.root] = now
+        try:
+            self.prune(now)
+        except OSError as e:
+            print(f"Could not prune the PDF store: {e}")
+
+    def get_pages(self, sha256):
+        """Return the cached text of every page, or None."""
+        return self._read(self.path_for(sha256, ".pages.json"), json.load)
+
+    def put_pages(self, sha256, pages):
+        self._write(self.path_for(sha256, ".pages.json"), lambda f: json.dump(pages, f, ensure_ascii=False))
+
+    def get_analysis(self, sha256, keywords, variant=""):
+        return self._read(self.path_for(sha256, self._analysis_suffix(keywords, variant)), json.load)
+
+    def put_analysis(self, sha256, keywords, analysis, variant=""):
+        self._write(
+            self.path_for(sha256, self._analysis_suffix(keywords, variant)),
+            lambda f: json.dump(analysis, f, ensure_ascii=False)
+        )
+
+    @staticmethod
+    def _analysis_suffix(keywords, variant):
+        # Analyses depend on the keyword list and the analysis options, so changing either invalidates them
+        fingerprint = hashlib.sha256("\n".join([variant, *keywords]).encode("utf-8")).hexdigest()[:16]
+        return f".{fingerprint}.json"
+
+    def _read(self, path, reader):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = reader(f)
+        except FileNotFoundError:
+            return None
+        self._touch(path)
+        return value
+
+    # Mark a stored file as just used; returns False if it does not exist
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _remove(paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _write(path, writer):
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            writer(f)
+        os.replace(temp_path, path)
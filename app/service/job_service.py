@@ -0,0 +1,417 @@
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import logging
+import threading
+import time
+import uuid
+
+from app.core.config import settings
+from app.service import scraper_service
+from app.service.website_identifier_service import normalize_company_name
+from app.service.workspace import Workspace
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+# Finished with some, but not all, of its tasks failed (for a batch: some of its jobs failed)
+PARTIAL = "partial"
+
+
+class Job:
+    """
+    A company processing request tracked from submission to completion.
+
+    Task status changes and partial results are also recorded as an ordered list of events, so clients can
+    stream them while the job runs; a client that starts listening late is replayed the earlier events.
+    Listeners subscribe from an event loop and are fed without holding a thread while they wait.
+
+    The events are dropped once the job has finished, so its results are not held twice; a client that starts
+    listening after that is sent the final status of each task, each part of the result and the final event.
+    """
+
+    def __init__(self, company_name, tasks, max_age=None, force_refresh=False):
+        self.id = uuid.uuid4().hex
+        self.company_name = company_name
+        self.tasks = {task: PENDING for task in tasks}
+        self.max_age = max_age
+        self.force_refresh = force_refresh
+        self.status = PENDING
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+        self.events = []
+        self.subscribers = []
+        self.events_lock = threading.Lock()
+        # Task that emitted each part of the results, to label the parts replayed after the events are dropped
+        self.part_tasks = {}
+
+    # Set once the job has completed or failed and its finish time is recorded
+    @property
+    def finished(self):
+        return self.done.is_set()
+
+    # Identical requests share this key: the normalized company name and the set of tasks
+    @property
+    def key(self):
+        return normalize_company_name(self.company_name), frozenset(self.tasks)
+
+    def publish(self, event):
+        with self.events_lock:
+            self.events.append(event)
+            self._notify(event)
+
+    # Hand an event to every subscriber on its own event loop; called with events_lock held to keep the order
+    def _notify(self, event):
+        for loop, events in self.subscribers:
+            try:
+                loop.call_soon_threadsafe(events.put_nowait, event)
+            except RuntimeError:
+                # The subscriber's event loop is closed
+                pass
+
+    def subscribe(self):
+        """
+        Return an asyncio.Queue, bound to the running event loop, that receives every event of the job in order,
+        starting with the ones already published. The final event has type "job".
+        Call unsubscribe() with the queue once done with it.
+        """
+        events = asyncio.Queue()
+        with self.events_lock:
+            for event in self.events if not self.finished else self._final_events():
+                events.put_nowait(event)
+            if not self.finished:
+                self.subscribers.append((asyncio.get_running_loop(), events))
+        return events
+
+    # The events a finished job is replayed as, rebuilt from its final state
+    def _final_events(self):
+        for task_name, status in self.tasks.items():
+            yield {"type": "task", "task": task_name, "status": status}
+        for part, data in (self.result or {}).items():
+            yield {"type": "result", "task": self.part_tasks.get(part), "part": part, "data": data}
+        yield self._job_event()
+
+    def _job_event(self):
+        return {"type": "job", "status": self.status, "error": self.error}
+
+    def unsubscribe(self, events):
+        with self.events_lock:
+            self.subscribers = [subscriber for subscriber in self.subscribers if subscriber[1] is not events]
+
+    def on_progress(self, task_name, status):
+        if self.status == PENDING:
+            self.status = RUNNING
+            self.started_at = time.time()
+        self.tasks[task_name] = status
+        self.publish({"type": "task", "task": task_name, "status": status})
+
+    def on_partial(self, task_name, part, data):
+        self.part_tasks[part] = task_name
+        self.publish({"type": "result", "task": task_name, "part": part, "data": data})
+
+    # Record the combined results, failed if every task failed and partial if only some did
+    def settle(self, result):
+        self.result = result
+        failed = [task for task, status in self.tasks.items() if status == FAILED]
+        if not failed:
+            self.status = COMPLETED
+        elif len(failed) == len(self.tasks):
+            self.status = FAILED
+            self.error = f"Every task failed: {', '.join(failed)}"
+        else:
+            self.status = PARTIAL
+            self.error = f"Some tasks failed: {', '.join(failed)}"
+
+    # Record the finish time, publish the final event and drop the recorded events
+    def close(self):
+        self.finished_at = time.time()
+        with self.events_lock:
+            self._notify(self._job_event())
+            self.events = []
+            self.subscribers = []
+            self.done.set()
+
+    # Whether this job's results are at least as fresh as a request with these options asks for
+    def satisfies(self, max_age, force_refresh):
+        if self.force_refresh:
+            return True
+        if force_refresh:
+            return False
+        return max_age is None or (self.max_age is not None and self.max_age <= max_age)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "company_name": self.company_name,
+            "tasks": dict(self.tasks),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class Batch:
+    """
+    A group of company jobs submitted together and tracked as one. A finished batch is completed if every job
+    completed, failed if every job failed and partial otherwise.
+    """
+
+    def __init__(self, jobs):
+        self.id = uuid.uuid4().hex
+        self.jobs = jobs
+        self.created_at = time.time()
+
+    @property
+    def finished(self):
+        return all(job.finished for job in self.jobs)
+
+    @property
+    def status(self):
+        if self.finished:
+            if all(job.status == COMPLETED for job in self.jobs):
+                return COMPLETED
+            return FAILED if all(job.status == FAILED for job in self.jobs) else PARTIAL
+        if all(job.status == PENDING for job in self.jobs):
+            return PENDING
+        return RUNNING
+
+    @property
+    def finished_at(self):
+        return max((job.finished_at for job in self.jobs), default=self.created_at) if self.finished else None
+
+    def to_dict(self):
+        counts = {status: 0 for status in (PENDING, RUNNING, COMPLETED, PARTIAL, FAILED)}
+        for job in self.jobs:
+            counts[job.status] += 1
+        return {
+            "batch_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "counts": counts,
+            "jobs": [job.to_dict() for job in self.jobs],
+        }
+
+
+class JobManager:
+    """
+    Queues company processing jobs on a bounded pool and keeps their status and results in memory.
+
+    Finished jobs are kept for JOB_RETENTION_SECONDS so clients can poll for their results, and removed by a
+    background sweep every JOB_PURGE_INTERVAL_SECONDS once older than that.
+
+    Requests for a company and task set that is already queued or running attach to the existing job instead of
+    starting another, as long as that job's results are as fresh as they ask for.
+
+    Jobs of a batch do not take a slot of the job pool: they wait in a queue of their own, and at most
+    batch_max_concurrency of them at a time have their tasks queued on the orchestrator, whose separate website and
+    browser lanes (and the shared PDF extraction limit) decide what runs when. Single requests therefore only wait
+    behind those few batch jobs, not behind every company of a batch.
+
+    On shutdown, jobs that have not started are failed instead of being run.
+    """
+
+    def __init__(self, max_concurrency=None, retention_seconds=None, batch_max_concurrency=None):
+        self.retention_seconds = retention_seconds or settings.JOB_RETENTION_SECONDS
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrency or settings.JOB_MAX_CONCURRENCY,
+            thread_name_prefix="scraper-job"
+        )
+        self.batch_max_concurrency = batch_max_concurrency or settings.BATCH_MAX_CONCURRENCY
+        self.batch_queue = collections.deque()
+        self.batch_running = 0
+        self.dispatching = False
+        self.closed = False
+        self.jobs = {}
+        self.batches = {}
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.purger = None
+        self.stopped = threading.Event()
+
+    def submit(self, company_name, tasks, max_age=None, force_refresh=False):
+        """
+        Enqueue a job for the company and return it immediately, or return the identical job already in flight.
+        """
+        with self.lock:
+            self._start_purger()
+            self._purge_expired()
+            job, created = self._attach_or_create(company_name, tasks, max_age, force_refresh)
+        if created:
+            self.executor.submit(self._run, job).add_done_callback(functools.partial(self._on_queued_job_done, job))
+            logger.info("Queued job %s for company: %s", job.id, company_name)
+        else:
+            logger.info("Attached request for company %s to job %s", company_name, job.id)
+        return job
+
+    def submit_batch(self, companies):
+        """
+        Schedule a job for each (company_name, tasks, max_age, force_refresh) tuple and return the batch immediately.
+        """
+        jobs = []
+        with self.lock:
+            self._start_purger()
+            self._purge_expired()
+            for company in companies:
+                job, created = self._attach_or_create(*company)
+                jobs.append(job)
+                if created:
+                    self.batch_queue.append(job)
+            batch = Batch(jobs)
+            self.batches[batch.id] = batch
+        self._dispatch_batch_jobs()
+        logger.info("Queued batch %s with %d companies", batch.id, len(batch.jobs))
+        return batch
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def get_batch(self, batch_id):
+        with self.lock:
+            return self.batches.get(batch_id)
+
+    def shutdown(self, wait=False):
+        self.stopped.set()
+        with self.lock:
+            self.closed = True
+            queued = list(self.batch_queue)
+            self.batch_queue.clear()
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+        for job in queued:
+            self._abandon(job)
+
+    # Called with the lock held: return (job, created) for the request
+    def _attach_or_create(self, company_name, tasks, max_age=None, force_refresh=False):
+        job = Job(company_name, tasks, max_age, force_refresh)
+        existing = self.in_flight.get(job.key)
+        if existing is not None and not existing.finished and existing.satisfies(max_age, force_refresh):
+            return existing, False
+        self.jobs[job.id] = job
+        self.in_flight[job.key] = job
+        return job, True
+
+    def _finish(self, job):
+        if job.status in (COMPLETED, PARTIAL) and settings.PERSIST_RESULTS:
+            try:
+                scraper_service.persist_results(job.company_name, job.id, job.result)
+            except RuntimeError:
+                logger.warning("Results of job %s were not persisted: the writer is shut down.", job.id)
+        with self.lock:
+            if self.in_flight.get(job.key) is job:
+                del self.in_flight[job.key]
+        job.close()
+
+    def _run(self, job):
+        job.status = RUNNING
+        job.started_at = time.time()
+
+        try:
+            with Workspace(job.id) as workspace:
+                job.settle(scraper_service.process_company(
+                    job.company_name, list(job.tasks), workspace, job.on_progress, job.max_age, job.force_refresh,
+                    job.on_partial
+                ))
+        except Exception as e:
+            logger.exception("Job %s failed.", job.id)
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            self._finish(job)
+
+    # A job cancelled by shutdown while still queued never ran
+    def _on_queued_job_done(self, job, future):
+        if future.cancelled():
+            self._abandon(job)
+
+    # Fail a job that will never run because the service is shutting down
+    def _abandon(self, job):
+        job.error = "The service shut down before the job started."
+        job.status = FAILED
+        self._finish(job)
+
+    # Start queued batch jobs while fewer than batch_max_concurrency are running. A call made while another thread
+    # (or an outer call on this one) is dispatching returns at once; the dispatching loop sees the freed slots.
+    def _dispatch_batch_jobs(self):
+        with self.lock:
+            if self.dispatching:
+                return
+            self.dispatching = True
+        while True:
+            with self.lock:
+                if self.closed or not self.batch_queue or self.batch_running >= self.batch_max_concurrency:
+                    self.dispatching = False
+                    return
+                job = self.batch_queue.popleft()
+                self.batch_running += 1
+            self._start(job)
+
+    def _batch_job_done(self):
+        with self.lock:
+            self.batch_running -= 1
+        self._dispatch_batch_jobs()
+
+    # Queue the job's tasks without holding a thread while they run; the workspace is removed once they are done
+    def _start(self, job):
+        workspace = Workspace(job.id)
+        try:
+            workspace.create()
+            future = scraper_service.start_company(
+                job.company_name, list(job.tasks), workspace, job.on_progress, job.max_age, job.force_refresh,
+                job.on_partial
+            )
+        except Exception as e:
+            logger.exception("Job %s failed.", job.id)
+            job.error = str(e)
+            job.status = FAILED
+            workspace.cleanup()
+            self._finish(job)
+            self._batch_job_done()
+            return
+
+        def on_done(future):
+            try:
+                job.settle(future.result())
+            except Exception as e:
+                logger.exception("Job %s failed.", job.id)
+                job.error = str(e)
+                job.status = FAILED
+            finally:
+                workspace.cleanup()
+                self._finish(job)
+                self._batch_job_done()
+
+        future.add_done_callback(on_done)
+
+    # Called with the lock held: start the background sweep of expired jobs once the first job is submitted
+    def _start_purger(self):
+        if self.purger is None and not self.stopped.is_set():
+            self.purger = threading.Thread(target=self._purge_periodically, name="job-purger", daemon=True)
+            self.purger.start()
+
+    def _purge_periodically(self):
+        while not self.stopped.wait(settings.JOB_PURGE_INTERVAL_SECONDS):
+            with self.lock:
+                self._purge_expired()
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self.jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+        expired = [batch_id for batch_id, batch in self.batches.items() if batch.finished and batch.finished_at < cutoff]
+        for batch_id in expired:
+            del self.batches[batch_id]
+
+
+job_manager = JobManager()
@@ -0,0 +1,138 @@
+import concurrent.futures
+import functools
+import logging
+import threading
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Emit callback given to tasks when nobody listens for partial results
+def ignore_partial(part, data):
+    pass
+
+
+class TaskOrchestrator:
+    """
+    Runs registered scraper tasks in-process on long-lived thread pools.
+
+    Each task is a callable taking the company name, the job's Workspace and an emit(part, data) callback, and returning a dict
+    of results. A task may emit each top-level entry of its results as soon as it is ready, so callers can stream partial
+    results. The results of all tasks requested for a company are merged into a single dict, in the order the tasks were
+    requested.
+
+    Tasks named in `lanes` run on their own pool of that many workers, so each kind of work (website crawls, browser sessions)
+    is bounded separately and a backlog of one kind never holds up the other. Other tasks share a pool of max_workers.
+
+    With a results_cache, a task whose cached result is fresh enough is not run again, and the non-empty results of tasks
+    that did run are stored for later requests.
+    """
+
+    def __init__(self, registry, max_workers=None, lanes=None, results_cache=None):
+        self.registry = registry
+        self.results_cache = results_cache
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers or settings.ORCHESTRATOR_MAX_WORKERS,
+            thread_name_prefix="scraper-task"
+        )
+        self.lanes = {
+            task_name: concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"scraper-{task_name}")
+            for task_name, workers in (lanes or {}).items()
+        }
+
+    def submit(self, task_name, company_name, workspace, on_progress=None, on_partial=None):
+        """
+        Schedule a single registered task and return its Future.
+        on_progress(task_name, status) is called when the task starts running, and on_partial(task_name, part, data)
+        whenever the task emits part of its results.
+        """
+        task = self.registry[task_name]
+        emit = functools.partial(on_partial, task_name) if on_partial else ignore_partial
+
+        def run_task():
+            if on_progress:
+                on_progress(task_name, "running")
+            return task(company_name, workspace, emit)
+
+        return self.lanes.get(task_name, self.executor).submit(run_task)
+
+    def start(
+        self, company_name, task_names, workspace, on_progress=None, max_age=None, force_refresh=False, on_partial=None
+    ):
+        """
+        Schedule the given tasks and return a Future of their combined results, without blocking a thread while they run.
+        A failing or cancelled task is logged and contributes nothing to the combined results.
+        on_progress(task_name, status) is called as each task starts, completes or fails, or is answered from the cache.
+        on_partial(task_name, part, data) is called for each part a task emits, and for each entry of a cached result.
+        Cached results older than max_age seconds are ignored, and all of them are with force_refresh.
+        """
+        combined_future = concurrent.futures.Future()
+        combined_future.set_running_or_notify_cancel()
+        results = {}
+        remaining = set(task_names)
+        lock = threading.Lock()
+
+        def combine():
+            combined = {}
+            for task_name in task_names:
+                combined.update(results.get(task_name) or {})
+            return combined
+
+        def on_task_done(name, future):
+            try:
+                results[name] = future.result()
+                status = "completed"
+                if self.results_cache and results[name]:
+                    self.results_cache.put(company_name, name, results[name])
+            except concurrent.futures.CancelledError:
+                logger.warning("Task %s for %s was cancelled", name, company_name)
+                status = "failed"
+            except Exception:
+                logger.exception("Error occurred while running task %s for %s", name, company_name)
+                status = "failed"
+            if on_progress:
+                on_progress(name, status)
+
+            with lock:
+                remaining.discard(name)
+                if remaining:
+                    return
+            combined_future.set_result(combine())
+
+        if not remaining:
+            combined_future.set_result({})
+        for name in dict.fromkeys(task_names):
+            cached = None
+            if self.results_cache and not force_refresh:
+                cached = self.results_cache.get(company_name, name, max_age)
+            if cached is not None:
+                if on_progress:
+                    on_progress(name, "cached")
+                if on_partial:
+                    for part, data in cached.items():
+                        on_partial(name, part, data)
+                with lock:
+                    results[name] = cached
+                    remaining.discard(name)
+                    finished = not remaining
+                if finished:
+                    combined_future.set_result(combine())
+                continue
+            future = self.submit(name, company_name, workspace, on_progress, on_partial)
+            future.add_done_callback(functools.partial(on_task_done, name))
+        return combined_future
+
+    def run(
+        self, company_name, task_names, workspace, on_progress=None, max_age=None, force_refresh=False, on_partial=None
+    ):
+        """
+        Run the given tasks concurrently and return their combined results.
+        """
+        return self.start(
+            company_name, task_names, workspace, on_progress, max_age, force_refresh, on_partial
+        ).result()
+
+    # Without wait, tasks not yet started are cancelled and reported as failed
+    def shutdown(self, wait=True):
+        for executor in [self.executor, *self.lanes.values()]:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
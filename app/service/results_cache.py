@@ -0,0 +1,186 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+from app.service.website_identifier_service import normalize_company_name
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """Keeps cached results in a dict; lost when the process exits."""
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, company, task):
+        with self.lock:
+            return self.entries.get((company, task))
+
+    def put(self, company, task, stored_at, result):
+        with self.lock:
+            self.entries[(company, task)] = (stored_at, result)
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteCacheBackend:
+    """Keeps cached results in an embedded SQLite database file."""
+
+    def __init__(self, path=None):
+        self.connection = sqlite3.connect(path or settings.RESULTS_CACHE_SQLITE_PATH, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "company TEXT NOT NULL, task TEXT NOT NULL, stored_at REAL NOT NULL, result TEXT NOT NULL, "
+                "PRIMARY KEY (company, task))"
+            )
+
+    def get(self, company, task):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT stored_at, result FROM results WHERE company = ? AND task = ?", (company, task)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def put(self, company, task, stored_at, result):
+        payload = json.dumps(result, ensure_ascii=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO results (company, task, stored_at, result) VALUES (?, ?, ?, ?)",
+                (company, task, stored_at, payload)
+            )
+
+    def open(self):
+        pass
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class MongoCacheBackend:
+    """
+    Keeps cached results in a MongoDB collection. Results are stored as JSON text, since their keys (link texts,
+    URLs) may contain characters MongoDB does not allow in field names.
+
+    The client connects lazily, so creating the backend never waits for the server; open() does.
+    """
+
+    def __init__(self, url=None, database=None, collection=None):
+        from pymongo import MongoClient
+
+        self.client = MongoClient(
+            url or settings.MONGO_URL, serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS
+        )
+        self.collection = self.client[database or settings.MONGO_DATABASE][collection or settings.RESULTS_CACHE_COLLECTION]
+
+    # Create the lookup index; raises if the server cannot be reached within the server selection timeout
+    def open(self):
+        from pymongo import ASCENDING
+
+        self.collection.create_index([("company", ASCENDING), ("task", ASCENDING)], unique=True)
+
+    def get(self, company, task):
+        document = self.collection.find_one({"company": company, "task": task})
+        return (document["stored_at"], json.loads(document["result"])) if document else None
+
+    def put(self, company, task, stored_at, result):
+        self.collection.replace_one(
+            {"company": company, "task": task},
+            {"company": company, "task": task, "stored_at": stored_at, "result": json.dumps(result, ensure_ascii=False)},
+            upsert=True
+        )
+
+    def close(self):
+        self.client.close()
+
+
+BACKENDS = {
+    "memory": MemoryCacheBackend,
+    "sqlite": SQLiteCacheBackend,
+    "mongo": MongoCacheBackend,
+}
+
+
+class ResultsCache:
+    """
+    Cache of task results per (normalized company name, task), so a company processed recently is answered from
+    the cache instead of being crawled and searched again. A request for several tasks is assembled from the
+    entry of each task, and only the missing or stale ones are run.
+
+    Each task has its own time to live (RESULTS_CACHE_TTL_SECONDS, falling back to RESULTS_CACHE_DEFAULT_TTL_SECONDS);
+    a request may ask for fresher results with max_age. Backend errors are logged and treated as misses, so an
+    unavailable cache never fails a job.
+    """
+
+    def __init__(self, backend, ttls=None, default_ttl=None):
+        self.backend = backend
+        self.ttls = settings.RESULTS_CACHE_TTL_SECONDS if ttls is None else ttls
+        self.default_ttl = settings.RESULTS_CACHE_DEFAULT_TTL_SECONDS if default_ttl is None else default_ttl
+
+    def get(self, company_name, task_name, max_age=None):
+        """
+        Return the cached result of the task for the company, or None if it is missing or older than the
+        task's TTL or max_age seconds.
+        """
+        try:
+            entry = self.backend.get(normalize_company_name(company_name), task_name)
+        except Exception:
+            logger.exception("Could not read %s results for %s from the cache", task_name, company_name)
+            return None
+        if entry is None:
+            return None
+        stored_at, result = entry
+        limit = self.ttls.get(task_name, self.default_ttl)
+        if max_age is not None:
+            limit = min(limit, max_age)
+        return result if time.time() - stored_at <= limit else None
+
+    def open(self):
+        """
+        Prepare the backend, falling back to an in-memory cache if it is unavailable.
+        """
+        try:
+            self.backend.open()
+        except Exception:
+            logger.exception("Results cache backend is unavailable; using an in-memory cache instead")
+            try:
+                self.backend.close()
+            except Exception:
+                pass
+            self.backend = MemoryCacheBackend()
+
+    def put(self, company_name, task_name, result):
+        try:
+            self.backend.put(normalize_company_name(company_name), task_name, time.time(), result)
+        except Exception:
+            logger.exception("Could not write %s results for %s to the cache", task_name, company_name)
+
+    def close(self):
+        self.backend.close()
+
+# Create the results cache configured by RESULTS_CACHE_BACKEND, or None if caching is disabled. A backend that
+# cannot be created (e.g. its client library is missing) is replaced by an in-memory cache.
+def create_results_cache(backend=None):
+    backend = backend or settings.RESULTS_CACHE_BACKEND
+    if backend == "none":
+        return None
+    try:
+        return ResultsCache(BACKENDS[backend]())
+    except Exception:
+        logger.exception("Could not create the %s results cache; using an in-memory cache instead", backend)
+        return ResultsCache(MemoryCacheBackend())
+
+
+results_cache = create_results_cache()
@@ -1,8 +1,18 @@
 import argparse
-import concurrent.futures
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
-from app.scraper.pdf_scraper import PDFScraper
-from app.service.utils import run_subprocess
+import orjson
+
+from app.core.config import settings
+from app.scraper.automation.sedar_automation import SedarAutomation
+from app.scraper.automation.webdriver_pool import webdriver_pool
+from app.scraper.company_website_scraper import CompanyWebsiteScraper
+from app.service.orchestrator import TaskOrchestrator
+from app.service.results_cache import results_cache
+from app.service.website_identifier_service import get_company_website
+from app.service.workspace import Workspace
 
 # Task registry for dynamically adding and managing tasks
 TASK_REGISTRY = {}
@@ -11,64 +21,95 @@ TASK_REGISTRY = {}
 def register_task(name, function):
     TASK_REGISTRY[name] = function
 
-# Clears the downloads, json and temp folders
-def clear_directories():
-    processor = PDFScraper()
-    processor.clear_pdf_directory()
-    processor.clear_temp_directory()
-    processor.clear_json_directory()
-    print("Cleared all directories")
-
-# Script to run a python scripts in parallel
-def run_tasks_in_parallel(tasks, company_name):
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = [executor.submit(task, company_name) for task in tasks]
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                future.result()
-            except Exception as e:
-                print(f"Error occurred while running task: {e}")
-
-# Runs the website scraper
-def run_company_website_scraper(company_name):
+# Runs the website scraper and returns the scraped sections, emitting each section as soon as it is complete
+def run_company_website_scraper(company_name, workspace, emit):
     print(f"Running company_website_scraper for {company_name}...")
-    run_subprocess("app.scraper.company_website_scraper", company_name)
-
-# Runs the sedar automation scraper
-def run_sedar_automation(company_name):
+    website = get_company_website(company_name, settings.COMPANY_CSV_PATH)
+    if not website:
+        print(f"No website found for {company_name}")
+        return {}
+
+    scraper = CompanyWebsiteScraper(
+        "https://" + website,
+        pdf_directory=workspace.pdf_directory,
+        temp_directory=workspace.temp_directory,
+        json_directory=workspace.json_directory,
+        on_section=emit
+    )
+    scraper.scrape()
+    return scraper.data
+
+# Runs the sedar automation scraper and returns the keyword analysis of the annual report, emitting it once ready
+def run_sedar_automation(company_name, workspace, emit):
     print(f"Running sedar_automation for {company_name}...")
-    run_subprocess("app.automation.sedar_automation", company_name)
+    with webdriver_pool.lease() as session:
+        scraper = SedarAutomation(
+            pdf_directory=workspace.pdf_directory,
+            temp_directory=workspace.temp_directory,
+            json_directory=workspace.json_directory,
+            session=session
+        )
+        scraper.download_company_annual_report(company_name)
+    for name, analysis in scraper.data.items():
+        emit(name, analysis)
+    return scraper.data
 
 # Registering tasks
 register_task("website", run_company_website_scraper)
 register_task("sedar", run_sedar_automation)
 
-# Combines all json files in the json folder
-def combine_all_json_files(output_file="combined_results.json"):
-    processor = PDFScraper()
-    processor.combine_json_files(output_file)
-    print(f"Combined JSON files into {output_file}")
+# Long-lived orchestrator running the registered tasks inside the API process, with website crawls and browser
+# sessions bounded separately and recent results answered from the results cache
+orchestrator = TaskOrchestrator(
+    TASK_REGISTRY,
+    lanes={"website": settings.WEBSITE_MAX_CONCURRENCY, "sedar": settings.WEBDRIVER_POOL_SIZE},
+    results_cache=results_cache
+)
+
+# Single background writer for opt-in result persistence, so writing never holds up a response
+result_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="result-writer")
+
+# Writes results to a JSON file, replacing it atomically
+def write_results(results, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+    os.replace(temp_path, path)
+    print(f"Results saved to {path}")
+
+# Queues the combined results of a job to be written under RESULTS_DIRECTORY and returns the write's Future
+def persist_results(company_name, job_id, results):
+    path = os.path.join(settings.RESULTS_DIRECTORY, f"{company_name.replace(' ', '_')}_{job_id}.json")
+    return result_writer.submit(write_results, results, path)
+
+# Runs the requested tasks for a company inside the given workspace and returns the combined results
+def process_company(
+    company_name, task_names, workspace, on_progress=None, max_age=None, force_refresh=False, on_partial=None
+):
+    return orchestrator.run(company_name, task_names, workspace, on_progress, max_age, force_refresh, on_partial)
+
+# Schedules the requested tasks for a company and returns a Future of the combined results
+def start_company(
+    company_name, task_names, workspace, on_progress=None, max_age=None, force_refresh=False, on_partial=None
+):
+    return orchestrator.start(company_name, task_names, workspace, on_progress, max_age, force_refresh, on_partial)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run automation tasks for a company.")
     parser.add_argument("company_name", type=str, help="The name of the company to process.")
     parser.add_argument("--tasks", nargs="*", choices=TASK_REGISTRY.keys(), help="Run the scrapers and automations.")
 
-    print("Starting the automation tasks...")
-
     args = parser.parse_args()
 
     print("Starting the automation tasks...")
 
-    # Clears the downloads, json and temp folders
-    clear_directories()
+    # Runs the scrapers and automations in parallel in a fresh workspace, which is kept for inspection
+    workspace = Workspace().create()
+    results = process_company(args.company_name, args.tasks or [], workspace)
+    orchestrator.shutdown()
 
-    # Runs the scrapers and automations in parallel
-    if args.tasks:
-        tasks_to_run = [TASK_REGISTRY[task] for task in args.tasks]
-        run_tasks_in_parallel(tasks_to_run, args.company_name)
-    
-    # Combines all json files in the json folder
-    combine_all_json_files()
+    # Writes the combined results gathered in memory
+    write_results(results, os.path.join(workspace.json_directory, "combined_results.json"))
 
-    print("All tasks completed.")
+    print(f"All tasks completed. Results are in {workspace.path}")
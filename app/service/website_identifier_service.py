@@ -1,4 +1,151 @@
 import csv
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+from app.core.config import settings
+
+# Legal-form words dropped from the end of company names before matching
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "ltd", "limited", "ltee", "corp", "corporation", "co", "company",
+    "llc", "lp", "llp", "plc", "ulc", "sa", "ag", "nv",
+}
+NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+# Normalize a company name for matching: lowercase, accents and punctuation removed and trailing legal suffixes
+# stripped, so "Acme Corp." and "ACME Corporation" both become "acme"
+def normalize_company_name(name):
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    words = NON_ALPHANUMERIC.sub(" ", ascii_name.lower().replace("&", " and ")).split()
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class IndexSnapshot:
+    """
+    One loaded state of a CompanyWebsiteIndex. It is never modified after it is built, so a lookup that reads
+    the index's snapshot once sees a consistent set of tables while a reload swaps in a new one.
+    """
+
+    __slots__ = ("signature", "exact", "normalized", "names", "gram_counts", "postings")
+
+    def __init__(self, signature=None, exact=None, normalized=None, names=(), gram_counts=(), postings=None):
+        self.signature = signature
+        self.exact = exact or {}
+        self.normalized = normalized or {}
+        self.names = names
+        self.gram_counts = gram_counts
+        self.postings = postings or {}
+
+
+class CompanyWebsiteIndex:
+    """
+    In-memory index of a company CSV (with `name` and `website` columns), loaded once and reloaded whenever the
+    file changes on disk.
+
+    A lookup tries the name as given (case-insensitive), then its normalized form, then the closest normalized
+    name by trigram similarity, accepted only if it reaches min_similarity. When several rows share a name the
+    first one wins, as with a top-to-bottom scan of the file.
+    """
+
+    def __init__(self, csv_file_path, min_similarity=None):
+        self.csv_file_path = csv_file_path
+        self.min_similarity = settings.COMPANY_MATCH_MIN_SIMILARITY if min_similarity is None else min_similarity
+        self.lock = threading.Lock()
+        self.snapshot = IndexSnapshot()
+
+    def lookup(self, company_name):
+        """
+        Return the website for the company, or None if no row matches.
+        """
+        snapshot = self._ensure_loaded()
+        website = snapshot.exact.get(company_name.strip().lower())
+        if website is not None:
+            return website
+
+        normalized = normalize_company_name(company_name)
+        website = snapshot.normalized.get(normalized)
+        if website is not None:
+            return website
+
+        match = self._closest_name(snapshot, normalized)
+        if match:
+            print(f"Matched '{company_name}' to '{match}'")
+            return snapshot.normalized[match]
+        return None
+
+    def _closest_name(self, snapshot, normalized):
+        if not normalized or not self.min_similarity:
+            return None
+        grams = trigrams(normalized)
+        shared = Counter()
+        for gram in grams:
+            shared.update(snapshot.postings.get(gram, ()))
+
+        best_name, best_score = None, self.min_similarity
+        for name_id, count in shared.items():
+            # Dice coefficient of the two trigram sets
+            score = 2 * count / (len(grams) + snapshot.gram_counts[name_id])
+            if score >= best_score:
+                best_name, best_score = snapshot.names[name_id], score
+        return best_name
+
+    # Reload the index if the file has been modified, replaced or removed since it was last read, and return the
+    # current snapshot
+    def _ensure_loaded(self):
+        try:
+            stat = os.stat(self.csv_file_path)
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            signature = None
+        snapshot = self.snapshot
+        if signature == snapshot.signature and signature is not None:
+            return snapshot
+        with self.lock:
+            snapshot = self.snapshot
+            if signature != snapshot.signature or signature is None:
+                # Swap in the new tables with a single assignment, so concurrent lookups never mix two loads
+                snapshot = self.snapshot = self._load(signature)
+            return snapshot
+
+    def _load(self, signature):
+        exact, normalized, names, gram_counts, postings = {}, {}, [], [], defaultdict(list)
+        try:
+            with open(self.csv_file_path, 'r', encoding='utf-8') as csvfile:
+                for row in csv.DictReader(csvfile):
+                    # Key names based on csv file
+                    website = row['website'].strip()
+                    exact.setdefault(row['name'].strip().lower(), website)
+                    name = normalize_company_name(row['name'])
+                    if name and name not in normalized:
+                        normalized[name] = website
+                        grams = trigrams(name)
+                        for gram in grams:
+                            postings[gram].append(len(names))
+                        names.append(name)
+                        gram_counts.append(len(grams))
+        except Exception as e:
+            print(f"Error reading CSV file: {e}")
+        return IndexSnapshot(signature, exact, normalized, tuple(names), tuple(gram_counts), dict(postings))
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+# Get the shared index of a CSV file
+def get_website_index(csv_file_path):
+    with _indexes_lock:
+        index = _indexes.get(csv_file_path)
+        if index is None:
+            index = _indexes[csv_file_path] = CompanyWebsiteIndex(csv_file_path)
+        return index
 
 # Get the company's website
 def get_company_website(company_name, csv_file_path):
@@ -10,13 +157,4 @@ def get_company_website(company_name, csv_file_path):
 
 # Search for a company website in a given csv file
 def search_csv_for_website(company_name, csv_file_path):
-    try:
-        with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                # Key names based on csv file
-                if row['name'].strip().lower() == company_name.strip().lower():
-                    return row['website'].strip()
-    except Exception as e:
-        print(f"Error reading CSV file: {e}")
-    return None
\ No newline at end of file
+    return get_website_index(csv_file_path).lookup(company_name)
@@ -0,0 +1,37 @@
+import os
+import shutil
+import uuid
+
+from app.core.config import settings
+
+
+class Workspace:
+    """
+    Private set of PDF, temp download and JSON directories for a single job.
+
+    Used as a context manager, the directories are created on entry and removed on exit so concurrent
+    jobs never see or delete each other's files.
+    """
+
+    def __init__(self, workspace_id=None, root=None):
+        self.id = workspace_id or uuid.uuid4().hex
+        self.path = os.path.join(root or settings.WORKSPACE_ROOT, self.id)
+        self.pdf_directory = os.path.join(self.path, "downloaded_pdfs")
+        self.temp_directory = os.path.join(self.path, "temp_downloads")
+        self.json_directory = os.path.join(self.path, "json_files")
+
+    def create(self):
+        """Create the workspace directories."""
+        for directory in (self.pdf_directory, self.temp_directory, self.json_directory):
+            os.makedirs(directory, exist_ok=True)
+        return self
+
+    def cleanup(self):
+        """Delete the workspace and everything in it."""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self.create()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cleanup()
@@ -0,0 +1,77 @@
+from collections import deque
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton matching many keywords in a single linear scan of the text.
+
+    Each keyword is registered under one or more labels (e.g. a website section or a PDF keyword) and
+    matching reports labels rather than keywords. Matching is case-insensitive: keywords are lowercased when
+    the automaton is built and callers pass text that is already lowercased. Overlapping and nested keywords
+    are all reported.
+    """
+
+    def __init__(self, labelled_keywords):
+        """
+        labelled_keywords: mapping of label -> iterable of keywords.
+        """
+        # Trie as a list of {char: state} dicts, with the labels of keywords ending in each state
+        self.transitions = [{}]
+        self.outputs = [set()]
+        for label, keywords in labelled_keywords.items():
+            for keyword in keywords:
+                state = 0
+                for char in keyword.lower():
+                    next_state = self.transitions[state].get(char)
+                    if next_state is None:
+                        next_state = len(self.transitions)
+                        self.transitions[state][char] = next_state
+                        self.transitions.append({})
+                        self.outputs.append(set())
+                    state = next_state
+                self.outputs[state].add(label)
+        self._build()
+
+    def _build(self):
+        # Breadth-first pass computing failure links, then folding them into a full transition table so that
+        # scanning needs exactly one dict lookup per character
+        fail = [0] * len(self.transitions)
+        queue = deque(self.transitions[0].values())
+        order = []
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for char, next_state in self.transitions[state].items():
+                fallback = fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = self.transitions[fallback].get(char, 0)
+                queue.append(next_state)
+
+        for state in order:
+            self.outputs[state] |= self.outputs[fail[state]]
+            inherited = self.transitions[fail[state]]
+            self.transitions[state] = {**inherited, **self.transitions[state]}
+        self.outputs = [frozenset(labels) for labels in self.outputs]
+
+    def iter_matches(self, text):
+        """
+        Yield (end_index, labels) for every position in the lowercased text where at least one keyword ends.
+        end_index is the index just past the end of the match.
+        """
+        transitions = self.transitions
+        outputs = self.outputs
+        state = 0
+        for index, char in enumerate(text):
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                yield index + 1, outputs[state]
+
+    def match(self, text):
+        """
+        Return the set of labels with at least one keyword in the lowercased text.
+        """
+        found = set()
+        for _, labels in self.iter_matches(text):
+            found |= labels
+        return found
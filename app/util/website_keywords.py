@@ -1,3 +1,5 @@
+from app.util.keyword_matcher import KeywordMatcher
+
 # Keywords to identify sections of interest on the website
 keywords = {
     'about': ["about", "our story", "company", "about us"],
@@ -15,4 +17,10 @@ exclusion_keywords = [
     "support", "help", "faq", "documentation", "customer service",
     "contact us", "contactus", "contact-us", "blog", "newsletter",
     "what's new"
-]
\ No newline at end of file
+]
+
+# Label reported by the matcher for exclusion keywords
+EXCLUDED = "excluded"
+
+# All section and exclusion keywords compiled into one automaton at startup
+matcher = KeywordMatcher({**keywords, EXCLUDED: exclusion_keywords})
@@ -0,0 +1,98 @@
+"""
+Compare the HTML parser backends used by CompanyWebsiteScraper.
+
+Parses each page with every installed backend, reports pages/second and lists the pages on which the output
+differs from the bs4 backend. Pages are read from the given files or URLs; without arguments a synthetic
+corporate page and a set of malformed pages are used. The fast backends follow the HTML5 tree building rules,
+which bs4's html.parser does not, so they are expected to differ on the malformed pages.
+
+    python -m benchmarks.html_parser_benchmark [--repeat N] [page.html | https://... ...]
+"""
+import argparse
+import time
+
+from app.scraper.html_parsers import PARSERS
+from app.scraper.http_client import close_fetcher, get_fetcher
+
+
+def synthetic_page(sections=40, links_per_section=25):
+    parts = ["<html><body><nav>"]
+    parts += [f'<a href="/menu/{i}">Products &amp; services {i}</a>' for i in range(30)]
+    parts.append("</nav>")
+    for s in range(sections):
+        parts.append(f"<div class='section'><h2>Section {s}</h2>")
+        parts += [
+            f"<p>Our <b>sustainability</b> commitment {s}.{i}: reducing emissions &nbsp; across operations.</p>"
+            for i in range(5)
+        ]
+        parts += [
+            f'<a href="/reports/{s}/{i}.pdf"><span> Annual report </span>{s}-{i}</a>'
+            for i in range(links_per_section)
+        ]
+        parts.append("</div>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+# Malformed markup on which the backends build different trees
+MALFORMED_PAGES = [
+    ("unclosed-p", "<html><body><p>First<p>Second<div>Block</div></body></html>"),
+    ("nested-a", '<html><body><p><a href="/outer">outer<a href="/inner">inner</a></a></p></body></html>'),
+    ("template", '<html><body><template><p>hidden</p><a href="/t">t</a></template><p>shown</p></body></html>'),
+]
+
+
+def load_pages(sources):
+    pages = []
+    for source in sources:
+        if source.startswith("http"):
+            response = get_fetcher().get(source)
+            response.raise_for_status()
+            pages.append((source, response.text))
+        else:
+            with open(source, "r", encoding="utf-8", errors="ignore") as f:
+                pages.append((source, f.read()))
+    return pages or [("synthetic", synthetic_page()), *MALFORMED_PAGES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends.")
+    parser.add_argument("sources", nargs="*", help="HTML files or URLs to parse.")
+    parser.add_argument("--repeat", type=int, default=20, help="Times each page is parsed per backend.")
+    args = parser.parse_args()
+
+    pages = load_pages(args.sources)
+    close_fetcher()
+
+    backends = []
+    for name, parser_class in PARSERS.items():
+        try:
+            backends.append(parser_class())
+        except ImportError:
+            print(f"{name}: not installed, skipped")
+
+    reference = {name: PARSERS["bs4"]().parse(html) for name, html in pages}
+    differences = []
+    for backend in backends:
+        mismatches = [name for name, html in pages if backend.parse(html) != reference[name]]
+        differences += [(backend, name, html) for name, html in pages if name in mismatches]
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for _, html in pages:
+                backend.parse(html)
+        elapsed = time.perf_counter() - start
+
+        pages_per_second = args.repeat * len(pages) / elapsed
+        status = "matches bs4" if not mismatches else f"differs from bs4 on: {', '.join(mismatches)}"
+        print(f"{backend.name:>10}: {pages_per_second:10.1f} pages/s  ({status})")
+
+    for backend, name, html in differences:
+        expected, actual = reference[name], backend.parse(html)
+        print(f"\n{backend.name} on {name}:")
+        print(f"  bs4 paragraphs: {expected.paragraphs}\n  {backend.name} paragraphs: {actual.paragraphs}")
+        print(f"  bs4 links: {expected.links}\n  {backend.name} links: {actual.links}")
+
+
+if __name__ == "__main__":
+    main()